@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+
+import metrics
+
+# Alert pipeline decoupled from the poll loop.
+#
+# check_orders() only submits an Alert; a dedicated worker thread shows the
+# notification and plays the sound. Waiting alerts are served by priority
+# (URGENT, then NORMAL, then LOW; first come first served within a level).
+# The queue is bounded: when it is full a new order alert is merged into the
+# newest waiting one of the same priority; otherwise the oldest waiting alert
+# that matters no more than the new one is pushed out, and if every waiting
+# alert matters more, the new one is dropped. Order alerts matter more than
+# error / info alerts of the same priority, so those never push out an order
+# alert. Urgent alerts are never merged or dropped. Every backend call runs
+# with a timeout so a hung ffplay/paplay or notification daemon can't stall
+# the worker for good.
+
+# =============== CONFIGURATION ===============
+QUEUE_SIZE = 10         # Alerts waiting before merge / drop kicks in
+BACKEND_TIMEOUT = 10    # Seconds a sound or notification call may take
+# ============================================
+
+URGENT, NORMAL, LOW = 0, 1, 2   # Alert priorities, served lowest number first
+
+
+def _rank(alert):
+    """Higher is dropped first when the queue is full"""
+    return alert.priority, alert.kind != "orders"
+
+
+class Alert:
+    """One thing to tell staff about"""
+
+    def __init__(self, title, message, orders=None, kind="orders", priority=NORMAL, heading=None):
+        self.title = title
+        self.message = message
+        self.orders = list(orders or [])
+        self.kind = kind  # "orders", "error" or "info"
+        self.priority = priority
+        self.heading = heading  # Summary heading used when merging (None: coalesce.HEADING)
+        self.created = time.monotonic()
+
+    def merge(self, other):
+        """Fold another order alert into this one"""
+        from coalesce import HEADING, summarize  # coalesce imports this module
+        self.orders.extend(other.orders)
+        self.message = summarize(self.orders, self.heading or HEADING)
+
+
+def call_with_timeout(func, *args, timeout=BACKEND_TIMEOUT, **kwargs):
+    """Run func in a helper thread; give up waiting after timeout seconds"""
+    result = {}
+
+    def target():
+        try:
+            result["value"] = func(*args, **kwargs)
+        except Exception as e:
+            result["error"] = e
+
+    helper = threading.Thread(target=target, daemon=True)
+    helper.start()
+    helper.join(timeout)
+    if helper.is_alive():
+        raise TimeoutError(f"{getattr(func, '__name__', func)} took longer than {timeout}s")
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
+
+
+class AlertQueue:
+    """Bounded alert queue served by one worker thread"""
+
+    def __init__(self, handler, maxsize=QUEUE_SIZE):
+        self.handler = handler  # Called as handler(alert) on the worker thread
+        self.maxsize = maxsize
+        self.stats = {"submitted": 0, "handled": 0, "merged": 0, "dropped": 0, "errors": 0}
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._worker = threading.Thread(target=self._run, name="alerts", daemon=True)
+        self._worker.start()
+
+    def submit(self, alert):
+        """Queue an alert; never blocks the caller"""
+        with self._cond:
+            self.stats["submitted"] += 1
+            if len(self._pending) >= self.maxsize and alert.priority != URGENT:
+                same = [a for a in self._pending if a.priority == alert.priority]
+                if alert.kind == "orders" and same and same[-1].kind == "orders":
+                    same[-1].merge(alert)
+                    self.stats["merged"] += 1
+                    return
+            if len(self._pending) >= self.maxsize and alert.priority != URGENT:
+                droppable = [a for a in self._pending
+                             if a.priority != URGENT and _rank(a) >= _rank(alert)]
+                self.stats["dropped"] += 1
+                if not droppable:
+                    return  # Everything waiting matters more than this one
+                lowest = max(map(_rank, droppable))
+                self._pending.remove(next(a for a in droppable if _rank(a) == lowest))
+            self._pending.append(alert)
+            self._cond.notify()
+
+    def depth(self):
+        with self._cond:
+            return len(self._pending)
+
+    def stop(self, timeout=5):
+        """Let the worker finish what is queued, then stop it"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._worker.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                alert = min(self._pending, key=lambda a: a.priority)  # Oldest of the most urgent
+                self._pending.remove(alert)
+            try:
+                self.handler(alert)
+                self.stats["handled"] += 1
+                metrics.record_alert(alert)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"Alert failed: {e}")
@@ -0,0 +1,228 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from fake_server import Faults, OrderFeed, generate_orders, serve
+
+# Benchmark harness: runs notifier variants against fake_server.py and
+# reports what they achieve under a given load.
+#
+#   python bench.py                                  # final, nf, end with defaults
+#   python bench.py final --rate 600 --items 5 --latency 0.05 --error-rate 0.05
+#   python bench.py final --push --duration 120 --output bench_output.txt
+#
+# The fake server and order generator run in this process. Each variant runs
+# in its own child process (so CPU and RSS are the notifier's alone), with
+# alerts captured instead of shown. A child imports the variant, then drives
+# its Notifier's step() loop for DURATION seconds plus a short drain, and
+# reports:
+#   throughput     orders alerted per second
+#   alert latency  order created_at -> alert handed to the backends (p50/p95/p99/max)
+#   polls, errors  from metrics.py
+#   cpu, rss       process CPU seconds (and % of wall time), peak resident memory
+
+# =============== CONFIGURATION ===============
+VARIANTS = ["final", "nf", "end"]
+DURATION = 30                # Seconds of load per variant
+DRAIN = 8                    # Extra seconds for late alerts (covers the coalesce window)
+RATE = 120                   # Orders per minute
+INTERVAL = 1.0               # Fixed poll interval (0 = the variant's adaptive scheduler)
+# ============================================
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def peak_rss_mb():
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 2**20, 1)
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def run_child(variant, duration, drain, interval, push):
+    """Inside the child: import the variant, drive it, return the result dict"""
+    os.environ["NOTIFIER_DATA_DIR"] = tempfile.mkdtemp(prefix=f"bench-{variant}-")  # Fresh db / checkpoint
+    os.chdir(os.environ["NOTIFIER_DATA_DIR"])
+    sys.path.insert(0, HERE)
+    real_stdout, sys.stdout = sys.stdout, open(os.devnull, "w")  # Variants print every order
+
+    started = time.perf_counter()
+    notifier = importlib.import_module(variant).notifier
+    import_time = time.perf_counter() - started
+    import metrics
+
+    latencies = []
+    alerts = [0]
+
+    def capture(alert):
+        if alert.kind != "orders":
+            return
+        alerts[0] += 1
+        now = datetime.now(timezone.utc)
+        for order in alert.orders:
+            created = order.created_at
+            if created is not None:
+                if created.tzinfo is None:
+                    created = created.astimezone()
+                latencies.append((now - created).total_seconds())
+
+    notifier.alert_queue.handler = capture
+    if not push:
+        notifier.push = None
+    if interval:
+        notifier.scheduler.next_interval = lambda: interval
+
+    def loop():
+        notifier.cycle.begin()
+        while True:
+            notifier.step()
+            notifier.cycle.wait()
+
+    print("ready", file=real_stdout, flush=True)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    threading.Thread(target=loop, daemon=True).start()
+    time.sleep(duration + drain)
+    notifier.coalescer.flush()
+    time.sleep(0.2)
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+
+    return {
+        "variant": variant,
+        "mode": "push" if push else "poll",
+        "import_s": round(import_time, 3),
+        "alerted": len(latencies),
+        "alerts": alerts[0],
+        "throughput": round(len(latencies) / duration, 2),
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "latency_p99": percentile(latencies, 0.99),
+        "latency_max": max(latencies) if latencies else None,
+        "polls": metrics.POLLS.value,
+        "errors": metrics.ERRORS.value,
+        "cpu_s": round(cpu, 3),
+        "cpu_pct": round(100 * cpu / wall, 2),
+        "rss_mb": peak_rss_mb(),
+    }
+
+
+def run_variant(variant, args):
+    """In the parent: fresh server + feed, spawn the child, generate load"""
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.hang_rate,
+                    malformed_rate=args.malformed_rate)
+    feed = OrderFeed(items=args.items, padding=args.padding)
+    server, feed = serve(0, feed=feed, faults=faults)
+    url = f"http://127.0.0.1:{server.server_port}/api/new-orders"
+    env = dict(os.environ, NOTIFIER_API_URL=url)
+    command = [sys.executable, os.path.abspath(__file__), "--child", variant,
+               "--duration", str(args.duration), "--drain", str(args.drain),
+               "--interval", str(args.interval)] + (["--push"] if args.push else [])
+
+    child = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, text=True)
+    stop = threading.Event()
+    try:
+        if child.stdout.readline().strip() != "ready":
+            child.wait()
+            return {"variant": variant, "skipped": f"exited with {child.returncode} before starting"}
+        threading.Thread(target=generate_orders, args=(feed, args.rate, True, stop),
+                         daemon=True).start()
+        time.sleep(args.duration)
+        stop.set()
+        output, _ = child.communicate(timeout=args.drain + 60)
+    finally:
+        stop.set()
+        if child.poll() is None:
+            child.kill()
+        server.shutdown()
+
+    result = json.loads(output.strip().splitlines()[-1])
+    result["generated"] = feed.last_id
+    result["server"] = dict(faults.stats)
+    return result
+
+
+def _s(value):
+    return "-" if value is None else f"{value * 1000:.0f}ms" if value < 1 else f"{value:.2f}s"
+
+
+def report(results, args):
+    lines = [
+        f"Benchmark {datetime.now():%Y-%m-%d %H:%M} - {args.duration}s at {args.rate:g} orders/min,"
+        f" items={args.items} padding={args.padding} latency={args.latency}s"
+        f" errors={args.error_rate:.0%} hangs={args.hang_rate:.0%} malformed={args.malformed_rate:.0%}",
+        f"{'variant':<8} {'mode':<5} {'alerted':>11} {'tput/s':>7} {'p50':>7} {'p95':>7}"
+        f" {'p99':>7} {'max':>7} {'polls':>6} {'errs':>5} {'cpu':>8} {'rss':>8} {'import':>7}",
+    ]
+    for r in results:
+        if "skipped" in r:
+            lines.append(f"{r['variant']:<8} skipped: {r['skipped']}")
+            continue
+        rss = f"{r['rss_mb']}MB" if r["rss_mb"] is not None else "-"
+        lines.append(
+            f"{r['variant']:<8} {r['mode']:<5} {r['alerted']:>5}/{r['generated']:<5} {r['throughput']:>7}"
+            f" {_s(r['latency_p50']):>7} {_s(r['latency_p95']):>7} {_s(r['latency_p99']):>7}"
+            f" {_s(r['latency_max']):>7} {r['polls']:>6} {r['errors']:>5}"
+            f" {r['cpu_pct']:>7}% {rss:>8} {_s(r['import_s']):>7}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark notifier variants against a fake API")
+    parser.add_argument("variants", nargs="*", default=VARIANTS)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    parser.add_argument("--drain", type=float, default=DRAIN)
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="Poll interval (0 = adaptive)")
+    parser.add_argument("--push", action="store_true", help="Let variants use the SSE stream")
+    parser.add_argument("--rate", type=float, default=RATE, help="Orders per minute")
+    parser.add_argument("--items", type=int, default=3, help="Line items per order")
+    parser.add_argument("--padding", type=int, default=0, help="Extra bytes per order")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each poll")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="Print raw results as JSON")
+    parser.add_argument("--output", help="Also append the report to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = run_child(args.child, args.duration, args.drain, args.interval, args.push)
+        print(json.dumps(result), file=sys.__stdout__, flush=True)
+        os._exit(0)  # Don't wait on the variant's worker threads
+
+    results = []
+    for variant in args.variants:
+        print(f"Running {variant}...", file=sys.stderr)
+        results.append(run_variant(variant, args))
+
+    text = json.dumps(results, indent=2) if args.json else report(results, args)
+    print(text)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(text + "\n\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+# Durable last_id checkpoint.
+#
+# last_id is written atomically (temp file + fsync + rename) after each
+# processed batch and read back at startup, so a restart asks the API for a
+# small delta instead of everything since id 0. Orders from the catch-up
+# right after load() that are older than MAX_CATCHUP_AGE are still recorded
+# but not alerted, which keeps a long outage (or a first run with no
+# checkpoint) from replaying a flood of old orders as "new". Live orders are
+# always alerted: their age depends on the server's timestamps and the
+# local clock agreeing.
+
+# =============== CONFIGURATION ===============
+CHECKPOINT_FILE = "last_id.json"   # In probe.DATA_DIR unless absolute
+MAX_CATCHUP_AGE = 3600   # Seconds; older orders are not alerted (0 = alert all)
+# ============================================
+
+
+class Checkpoint:
+    """Persists last_id across restarts"""
+
+    def __init__(self, path=CHECKPOINT_FILE, max_catchup_age=MAX_CATCHUP_AGE):
+        self.path = path
+        self.max_catchup_age = max_catchup_age
+        self.last_id = 0
+        self.saved_at = None
+        self.catching_up = False  # True from load() until caught_up()
+
+    def load(self):
+        """Return the saved last_id, or 0 if there is no usable checkpoint"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.last_id = int(data["last_id"])
+            self.saved_at = data.get("saved_at")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+        self.catching_up = True
+        return self.last_id
+
+    def caught_up(self):
+        """The backlog since the checkpoint has been fetched: stop the age cap"""
+        self.catching_up = False
+
+    def save(self, last_id):
+        """Atomically write last_id (no-op if it hasn't changed)"""
+        if last_id == self.last_id and self.saved_at is not None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        data = {"last_id": last_id, "saved_at": time.time()}
+        tmp = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".last_id.", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Couldn't save checkpoint {self.path}: {e}")
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+            return
+        self.last_id = last_id
+        self.saved_at = data["saved_at"]
+
+    def too_old(self, order):
+        """True if a catch-up order is past the catch-up age and shouldn't be alerted"""
+        if not self.catching_up or not self.max_catchup_age or order.created_at is None:
+            return False
+        created = order.created_at
+        if created.tzinfo is None:
+            created = created.astimezone()
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.max_catchup_age)
+        return created < cutoff
@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import Counter, deque
+
+from alerts import NORMAL, Alert
+from order import format_cents
+
+# Burst coalescing for order alerts.
+#
+# The first batch after a quiet spell is alerted straight away. Anything
+# arriving within WINDOW seconds after that is held and merged into a single
+# summary alert (count, total amount, top items) when the window closes.
+# No more than MAX_PER_MINUTE alerts are emitted per minute; if the cap is
+# reached, orders keep accumulating until a slot frees up. With
+# immediate=False even the first batch waits for the window (used for
+# low-priority orders, see priority.py).
+
+# =============== CONFIGURATION ===============
+WINDOW = 5            # Seconds to gather orders into one alert
+MAX_PER_MINUTE = 6    # Hard cap on order alerts per minute
+TOP_ITEMS = 3         # Items listed in the summary
+HEADING = "new order(s) received!"
+# ============================================
+
+
+def summarize(orders, heading=HEADING):
+    """One-line summary: count, total amount and the most ordered items"""
+    total = sum(o.amount_cents or 0 for o in orders)
+    parts = [f"{len(orders)} {heading}", f"Total {format_cents(total)}"]
+    items = Counter()
+    for order in orders:
+        for name, qty in order.items:
+            items[name] += qty
+    if items:
+        top = ", ".join(f"{name} x{qty}" for name, qty in items.most_common(TOP_ITEMS))
+        parts.append(f"Top: {top}")
+    return " · ".join(parts)
+
+
+class Coalescer:
+    """Merges orders arriving close together into one summary alert"""
+
+    def __init__(self, emit, title="New Orders Alert", window=WINDOW,
+                 max_per_minute=MAX_PER_MINUTE, priority=NORMAL, immediate=True, heading=HEADING):
+        self.emit = emit  # Called as emit(alert), e.g. AlertQueue.submit
+        self.title = title
+        self.window = window
+        self.max_per_minute = max_per_minute
+        self.priority = priority    # Priority of the alerts emitted
+        self.immediate = immediate  # Alert the first batch after a quiet spell at once
+        self.heading = heading      # "<count> <heading>" starts the summary
+        self.stats = {"orders": 0, "alerts": 0, "coalesced": 0, "rate_limited": 0}
+        self._pending = []
+        self._sent = deque()          # Monotonic times of recent alerts
+        self._window_ends = 0.0
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, orders):
+        """Hand over newly detected orders"""
+        if not orders:
+            return
+        with self._lock:
+            self.stats["orders"] += len(orders)
+            self._pending.extend(orders)
+            now = time.monotonic()
+            if (self.immediate and self._timer is None and now >= self._window_ends
+                    and self._slot_free(now)):
+                self._flush_locked(now)  # Quiet period: alert immediately
+            else:
+                self._schedule(now)
+
+    def flush(self):
+        """Emit whatever is pending now, ignoring the window (e.g. on shutdown)"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            if self._pending:
+                self._flush_locked(time.monotonic())
+
+    def _slot_free(self, now):
+        while self._sent and now - self._sent[0] >= 60:
+            self._sent.popleft()
+        return len(self._sent) < self.max_per_minute
+
+    def _schedule(self, now):
+        if self._timer is not None:
+            return
+        delay = max(self._window_ends - now, 0.0 if self.immediate else self.window)
+        if not self._slot_free(now):
+            self.stats["rate_limited"] += 1
+            delay = max(delay, 60 - (now - self._sent[0]))
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            if not self._pending:
+                return
+            now = time.monotonic()
+            if self._slot_free(now):
+                self._flush_locked(now)
+            else:
+                self._schedule(now)
+
+    def _flush_locked(self, now):
+        orders, self._pending = self._pending, []
+        self._sent.append(now)
+        self._window_ends = now + self.window
+        self.stats["alerts"] += 1
+        self.stats["coalesced"] += len(orders) - 1
+        self.emit(Alert(self.title, summarize(orders, self.heading), orders, priority=self.priority,
+                        heading=self.heading))
@@ -0,0 +1,84 @@
+import random
+import time
+
+# Connectivity tracking driven by the outcome of the real order poll.
+# Instead of probing google.com before every request, each call to the
+# orders API reports success or failure here. After enough consecutive
+# failures the circuit "opens" and polls are skipped until a cooldown has
+# passed; the next poll is then let through as a half-open probe.
+
+# =============== CONFIGURATION ===============
+FAILURE_THRESHOLD = 2   # Consecutive failures before the connection is "lost"
+OPEN_COOLDOWN = 30      # Seconds to wait before the first half-open probe
+MAX_COOLDOWN = 300      # Upper bound for the cooldown while still offline
+PROBE_JITTER = 0.2      # +/- fraction so terminals don't all probe at once
+# ============================================
+
+CLOSED = "closed"        # Online, every poll goes out
+OPEN = "open"            # Offline, polls are skipped until the cooldown ends
+HALF_OPEN = "half-open"  # One probe poll is in flight
+
+
+class Connectivity:
+    """Circuit breaker with Connection Lost / Restored transitions"""
+
+    def __init__(self, on_lost=None, on_restored=None,
+                 failure_threshold=FAILURE_THRESHOLD,
+                 cooldown=OPEN_COOLDOWN, max_cooldown=MAX_COOLDOWN):
+        self.on_lost = on_lost
+        self.on_restored = on_restored
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.retry_at = 0.0
+        self.last_error = None
+
+    @property
+    def online(self):
+        return self.state == CLOSED
+
+    def allow_request(self):
+        """Return True if a poll should be sent now"""
+        if self.state != OPEN:
+            return True
+        if time.monotonic() < self.retry_at:
+            return False
+        self.state = HALF_OPEN
+        return True
+
+    def record_success(self):
+        """The API answered: close the circuit"""
+        was_lost = self.state != CLOSED
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self.last_error = None
+        if was_lost and self.on_restored:
+            self.on_restored()
+
+    def record_failure(self, error=None):
+        """The API could not be reached"""
+        self.failures += 1
+        self.last_error = error
+        if self.state == HALF_OPEN:
+            # Probe failed: stay offline and wait longer before the next one
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+            if self.on_lost:
+                self.on_lost(error)
+
+    def seconds_until_probe(self):
+        """Time left before the next half-open probe (0 when not offline)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def _open(self):
+        self.state = OPEN
+        jitter = random.uniform(1 - PROBE_JITTER, 1 + PROBE_JITTER)
+        self.retry_at = time.monotonic() + self.cooldown * jitter
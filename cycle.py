@@ -0,0 +1,157 @@
+import time
+from contextlib import contextmanager
+
+import metrics
+
+# Fixed-rate poll cycle with per-phase time budgets.
+#
+# Polls start on deadlines taken from the monotonic clock: the next deadline
+# is the previous one plus the scheduler's interval, so the time a poll takes
+# no longer pushes every later poll back. A cycle still running at its
+# deadline is an overrun: it is reported, the deadlines it missed are
+# skipped (counted, not polled back to back) and the next cycle starts at
+# once.
+#
+# Each poll is split into phases, each with its own budget:
+#   connect   request sent until the response headers (retries included)
+#   read      streaming the orders out of the body
+#   dispatch  storing, checkpointing and queueing the alerts
+# A phase only gets what is left of the cycle. The connect phase is skipped
+# when less than MIN_PHASE is left; read and dispatch always get at least
+# MIN_PHASE. A read that uses up its budget stops early and the remaining
+# orders come with the next poll.
+#
+# A prepare hook (the connection warm-up in warm.py) runs PREPARE_AHEAD
+# seconds before each deadline, so the poll itself starts on time.
+#
+# SLA bounds the interval. An order placed just after a poll must still
+# show up within SLA seconds, so the interval is capped at
+# SLA - (connect + read + dispatch).
+
+# =============== CONFIGURATION ===============
+SLA = 60                # Seconds within which a new order must be visible
+CONNECT_BUDGET = 5      # Request up to the response headers
+READ_BUDGET = 10        # Reading the orders out of the body
+DISPATCH_BUDGET = 2     # Storing / checkpointing / queueing alerts
+MIN_PHASE = 0.5         # Skip (connect) or pad (read, dispatch) phases shorter than this
+OVERRUN_GRACE = 0.1     # Lateness below this is scheduling noise, not an overrun
+PREPARE_AHEAD = 2       # Seconds before a poll to run the prepare hook
+# ============================================
+
+PHASES = ("connect", "read", "dispatch")
+
+OVERRUNS = metrics.counter("notifier_cycle_overruns_total", "Poll cycles still running at their deadline")
+SKIPPED = metrics.counter("notifier_cycle_skipped_total", "Poll deadlines missed because of an overrun")
+PHASE_OVERRUNS = metrics.counter("notifier_phase_overruns_total", "Poll phases that went over their budget")
+LATENESS = metrics.histogram("notifier_cycle_late_seconds", "How far past its deadline an overrunning cycle ended")
+
+
+class Phase:
+    """One timed phase of a cycle; budget is None when the phase is skipped"""
+
+    def __init__(self, name, budget):
+        self.name = name
+        self.budget = budget
+        self.started = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def over(self):
+        return self.budget is not None and self.elapsed() > self.budget
+
+
+class PollCycle:
+    """Monotonic, drift-free poll deadlines with per-phase budgets"""
+
+    def __init__(self, scheduler, sla=SLA, connect=CONNECT_BUDGET, read=READ_BUDGET,
+                 dispatch=DISPATCH_BUDGET, report=print, prepare=None):
+        self.scheduler = scheduler
+        self.sla = sla
+        self.budgets = {"connect": connect, "read": read, "dispatch": dispatch}
+        self.report = report
+        self.prepare = prepare  # Called shortly before each poll
+        self.started = None    # Monotonic start of the current cycle
+        self.deadline = None   # Monotonic start of the next cycle
+        self.stats = {"cycles": 0, "overruns": 0, "skipped": 0, "worst_late": 0.0,
+                      "phase_overruns": dict.fromkeys(PHASES, 0), "phases_skipped": 0}
+
+    @property
+    def max_interval(self):
+        """Longest interval that still keeps orders within the SLA"""
+        return max(self.scheduler.min_interval, self.sla - sum(self.budgets.values()))
+
+    def interval(self):
+        return min(self.scheduler.next_interval(), self.max_interval)
+
+    def begin(self, at=None):
+        """Start a cycle now (first poll, after the push stream ends, after an overrun)"""
+        self.started = time.monotonic() if at is None else at
+        self.deadline = self.started + self.interval()
+        self.stats["cycles"] += 1
+
+    def wait(self):
+        """Sleep until the next deadline and start that cycle"""
+        if self.deadline is None:
+            self.begin()
+            return
+        now = time.monotonic()
+        if now < self.deadline:
+            if self.prepare:
+                time.sleep(max(self.deadline - PREPARE_AHEAD - now, 0))
+                try:
+                    self.prepare()
+                except Exception as e:
+                    self.report(f"Poll preparation failed: {e!r}")
+            time.sleep(max(self.deadline - time.monotonic(), 0))
+            self.begin(self.deadline)
+            return
+        late = now - self.deadline
+        if late < OVERRUN_GRACE:
+            self.begin(self.deadline)
+            return
+
+        period = self.deadline - self.started
+        missed = int(late // period) if period > 0 else 0
+        self.stats["overruns"] += 1
+        self.stats["skipped"] += missed
+        self.stats["worst_late"] = round(max(self.stats["worst_late"], late), 3)
+        OVERRUNS.inc()
+        SKIPPED.inc(missed)
+        LATENESS.observe(late)
+        self.report(f"⏱️ Poll cycle overran its deadline by {late:.1f}s"
+                    f"{f', skipped {missed} poll(s)' if missed else ''} (SLA {self.sla}s)")
+        self.begin(now)  # Rebase instead of polling back to back to catch up
+
+    def budget(self, name):
+        """Seconds phase `name` may take now (None = skip it)"""
+        left = self.deadline - time.monotonic() if self.deadline is not None else float("inf")
+        allowed = min(self.budgets[name], left)
+        if allowed >= MIN_PHASE:
+            return allowed
+        if name == "connect":
+            return None
+        return MIN_PHASE
+
+    @contextmanager
+    def phase(self, name):
+        """Time the with-block against the phase budget and report an overrun"""
+        phase = Phase(name, self.budget(name))
+        if phase.budget is None:
+            self.stats["phases_skipped"] += 1
+        try:
+            yield phase
+        finally:
+            if phase.over():
+                self.stats["phase_overruns"][name] += 1
+                PHASE_OVERRUNS.inc()
+                self.report(f"⏱️ {name} took {phase.elapsed():.1f}s of a {phase.budget:.1f}s budget")
+
+    def snapshot(self):
+        """Current state, for logging or inspection"""
+        now = time.monotonic()
+        return {
+            "max_interval": self.max_interval,
+            "next_in": round(self.deadline - now, 2) if self.deadline is not None else None,
+            **self.stats,
+        }
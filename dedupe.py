@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+# Bounded duplicate suppression for order ids.
+#
+# Overlapping pages, retried responses and ids arriving out of order must
+# not alert the same order twice. The most recent RECENT_IDS ids are kept
+# exactly in an LRU; ids that fall out of it are folded into a fixed-size
+# bitmap covering the BITMAP_SIZE ids below the highest id seen. Anything
+# older than the bitmap window is treated as already seen. Memory and the
+# cost per order stay constant however long the notifier runs.
+
+# =============== CONFIGURATION ===============
+RECENT_IDS = 4096          # Exact LRU of the newest ids
+BITMAP_SIZE = 1 << 20      # Ids covered by the bitmap (128 KiB)
+# ============================================
+
+
+class SeenOrders:
+    """Answers "have we already handled this order id?" in O(1)"""
+
+    def __init__(self, recent=RECENT_IDS, bitmap_size=BITMAP_SIZE):
+        self.recent_size = recent
+        self.bitmap_size = bitmap_size
+        self.stats = {"checked": 0, "duplicates": 0, "expired": 0}
+        self._recent = OrderedDict()
+        self._bits = bytearray(bitmap_size // 8)
+        self._base = None   # Lowest id covered by the bitmap
+        self._lock = threading.Lock()
+
+    def check(self, order_id):
+        """Record order_id; True if it was seen before (i.e. suppress it)"""
+        with self._lock:
+            self.stats["checked"] += 1
+            if self._seen(order_id):
+                self.stats["duplicates"] += 1
+                return True
+            self._add(order_id)
+            return False
+
+    def filter(self, orders):
+        """Drop orders whose id has already been handled"""
+        return [o for o in orders if not self.check(o.id)]
+
+    def __len__(self):
+        return len(self._recent)
+
+    def _seen(self, order_id):
+        if order_id in self._recent:
+            self._recent.move_to_end(order_id)
+            return True
+        if not isinstance(order_id, int) or self._base is None:
+            return False
+        if order_id < self._base:
+            self.stats["expired"] += 1  # Older than anything we still track
+            return True
+        offset = order_id - self._base
+        return offset < self.bitmap_size and bool(self._bits[offset >> 3] & (1 << (offset & 7)))
+
+    def _add(self, order_id):
+        self._recent[order_id] = None
+        if len(self._recent) > self.recent_size:
+            old, _ = self._recent.popitem(last=False)
+            self._set_bit(old)
+
+    def _set_bit(self, order_id):
+        if not isinstance(order_id, int):
+            return  # Non-numeric ids are only tracked by the LRU
+        if self._base is None:
+            self._base = max(order_id - self.bitmap_size // 2, 0) & ~7
+        offset = order_id - self._base
+        if offset < 0:
+            return  # Already below the window: treated as seen anyway
+        if offset >= self.bitmap_size:
+            self._slide(offset - self.bitmap_size + 1)
+            offset = order_id - self._base
+        self._bits[offset >> 3] |= 1 << (offset & 7)
+
+    def _slide(self, by):
+        """Move the window up by at least `by` ids, forgetting the oldest"""
+        shift = (by + 7) >> 3
+        if shift >= len(self._bits):
+            self._bits = bytearray(len(self._bits))
+        else:
+            self._bits = self._bits[shift:] + bytearray(shift)
+        self._base += shift * 8
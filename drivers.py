@@ -0,0 +1,264 @@
+import os
+import platform
+import subprocess
+import threading
+import time
+import warnings
+
+import probe
+from alerts import call_with_timeout
+from sound_cache import SoundPlayer
+
+# Sound and notification drivers.
+#
+# Each kind of output has an ordered list of drivers. The chain is resolved
+# once (from probe.py's cached capabilities) to the drivers that can work on
+# this machine; every alert then goes straight to the current driver, with
+# no platform checks or doomed subprocess spawns on the way. A driver that
+# raises, or hangs for DRIVER_TIMEOUT, is demoted for the rest of the run
+# and the next one takes over.
+#
+#   sound:   memory (decoded once, see sound_cache.py), winsound, paplay,
+#            aplay, afplay, ffplay, beep
+#   notify:  plyer, dbus, notify-send, console
+#
+# "beep" and "console" always work, so a chain never runs dry.
+
+# =============== CONFIGURATION ===============
+SOUND_DRIVERS = ["memory", "winsound", "paplay", "aplay", "afplay", "ffplay", "beep"]
+NOTIFY_DRIVERS = ["plyer", "dbus", "notify-send", "console"]
+PLAY_TIMEOUT = 5   # Seconds an external player process may run
+DRIVER_TIMEOUT = 8  # Seconds one driver call may take before the driver is demoted
+# ============================================
+
+# plyer warns on Linux when dbus-python is missing; the dbus driver covers that
+warnings.filterwarnings("ignore", message="The Python dbus package is not installed")
+
+_NO_WINDOW = {"creationflags": subprocess.CREATE_NO_WINDOW} if platform.system() == "Windows" else {}
+
+
+def beep(frequency=1000, duration=0.2):
+    """Short tone: winsound.Beep on Windows, the terminal bell elsewhere"""
+    if probe.has("winsound"):
+        import winsound
+        winsound.Beep(frequency, int(duration * 1000))
+    else:
+        print("\a", end="", flush=True)
+        time.sleep(duration)
+
+
+# ---------- Sound drivers: play(path) blocks until the sound has played ----------
+
+class MemorySound:
+    """In-process playback of the decoded sound (winsound / simpleaudio / PCM sink)"""
+
+    name = "memory"
+
+    def __init__(self, path):
+        self.player = SoundPlayer(path)
+
+    def available(self):
+        return self.player.prepare() is not None
+
+    def play(self, path):
+        self.player.play()
+
+
+class WinSound:
+    name = "winsound"
+
+    def available(self):
+        return probe.has("winsound")
+
+    def play(self, path):
+        import winsound
+        winsound.PlaySound(path, winsound.SND_FILENAME)
+
+
+class CommandSound:
+    """External player, started once per play"""
+
+    def __init__(self, name, command, wav_only=False):
+        self.name = name
+        self.command = command
+        self.wav_only = wav_only
+
+    def available(self):
+        return probe.has(self.command[0])
+
+    def play(self, path):
+        if self.wav_only and not path.lower().endswith(".wav"):
+            raise ValueError(f"{self.name} only plays WAV files")
+        result = subprocess.run(self.command + [path], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, timeout=PLAY_TIMEOUT, **_NO_WINDOW)
+        if result.returncode:
+            raise RuntimeError(f"{self.name} exited with {result.returncode}")
+
+
+class Beep:
+    name = "beep"
+
+    def available(self):
+        return True
+
+    def play(self, path):
+        beep(1000, 0.5)
+
+
+def sound_driver(name, path):
+    if name == "memory":
+        return MemorySound(path)
+    return {
+        "winsound": WinSound,
+        "paplay": lambda: CommandSound("paplay", ["paplay"]),
+        "aplay": lambda: CommandSound("aplay", ["aplay", "-q"], wav_only=True),
+        "afplay": lambda: CommandSound("afplay", ["afplay"]),
+        "ffplay": lambda: CommandSound("ffplay", ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]),
+        "beep": Beep,
+    }[name]()
+
+
+# ---------- Notification drivers: notify(title, message, app_name, timeout, urgent) ----------
+
+class PlyerNotify:
+    name = "plyer"
+
+    def available(self):
+        return probe.has("plyer")
+
+    def notify(self, title, message, app_name, timeout, urgent):
+        from plyer import notification
+        notification.notify(title=title, message=message, app_name=app_name,
+                            timeout=timeout, toast=urgent)
+
+
+class DbusNotify:
+    """org.freedesktop.Notifications over the session bus"""
+
+    name = "dbus"
+
+    def __init__(self):
+        self._interface = None
+
+    def available(self):
+        return (platform.system() == "Linux" and probe.has("dbus")
+                and bool(os.environ.get("DBUS_SESSION_BUS_ADDRESS")))
+
+    def notify(self, title, message, app_name, timeout, urgent):
+        if self._interface is None:
+            import dbus
+            bus = dbus.SessionBus()
+            obj = bus.get_object("org.freedesktop.Notifications", "/org/freedesktop/Notifications")
+            self._interface = dbus.Interface(obj, "org.freedesktop.Notifications")
+        hints = {"urgency": 2} if urgent else {}
+        self._interface.Notify(app_name, 0, "", title, message, [], hints, timeout * 1000)
+
+
+class NotifySend:
+    name = "notify-send"
+
+    def available(self):
+        return probe.has("notify-send")
+
+    def notify(self, title, message, app_name, timeout, urgent):
+        command = ["notify-send", "-a", app_name, "-t", str(timeout * 1000)]
+        if urgent:
+            command += ["-u", "critical"]
+        subprocess.run(command + [title, message], check=True, timeout=PLAY_TIMEOUT,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class ConsoleNotify:
+    name = "console"
+
+    def available(self):
+        return True
+
+    def notify(self, title, message, app_name, timeout, urgent):
+        print(f"\a\a[{title}] {message}")  # Two system beeps
+
+
+def notify_driver(name):
+    return {
+        "plyer": PlyerNotify,
+        "dbus": DbusNotify,
+        "notify-send": NotifySend,
+        "console": ConsoleNotify,
+    }[name]()
+
+
+class DriverChain:
+    """Ordered drivers of one kind; the first working one is used until it fails"""
+
+    def __init__(self, kind, drivers, timeout=DRIVER_TIMEOUT):
+        self.kind = kind
+        self.candidates = drivers
+        self.call_timeout = timeout
+        self.active = None
+        self.demoted = []
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        self.resolve()
+        return self.active[0].name if self.active else None
+
+    def resolve(self):
+        """Pick the usable drivers once (safe to call again)"""
+        with self._lock:
+            if self.active is not None:
+                return self.active
+            active = []
+            for driver in self.candidates:
+                try:
+                    if driver.available():
+                        active.append(driver)
+                except Exception as e:
+                    print(f"{self.kind} driver {driver.name} unavailable: {e}")
+            self.active = active
+            return active
+
+    def call(self, method, *args):
+        """Run method on the current driver, demoting drivers that fail or hang"""
+        self.resolve()
+        while self.active:
+            driver = self.active[0]
+            try:
+                return call_with_timeout(getattr(driver, method), *args, timeout=self.call_timeout)
+            except Exception as e:
+                with self._lock:
+                    if self.active and self.active[0] is driver:
+                        self.active.pop(0)
+                        self.demoted.append(driver.name)
+                following = self.active[0].name if self.active else "nothing"
+                print(f"{self.kind.capitalize()} driver {driver.name} failed ({e}); using {following}")
+        raise RuntimeError(f"no working {self.kind} driver")
+
+
+class Sound(DriverChain):
+    """Sound driver chain for one file"""
+
+    def __init__(self, path, drivers=SOUND_DRIVERS):
+        self.path = path
+        if not path or not os.path.exists(path):
+            print(f"Sound file not found at {path}; alerts will beep")
+            drivers = ["beep"]
+        super().__init__("sound", [sound_driver(name, path) for name in drivers])
+
+    def play(self, times=1, gap=0.3):
+        for i in range(times):
+            if i:
+                time.sleep(gap)
+            self.call("play", self.path)
+
+
+class Notify(DriverChain):
+    """Notification driver chain"""
+
+    def __init__(self, app_name, timeout=10, drivers=NOTIFY_DRIVERS):
+        self.app_name = app_name
+        self.timeout = timeout
+        super().__init__("notification", [notify_driver(name) for name in drivers])
+
+    def show(self, title, message, urgent=False):
+        self.call("notify", title, message, self.app_name, self.timeout, urgent)
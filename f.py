@@ -1,4 +1,6 @@
 import requests
+from http_session import get_session
+from order import Order
 
 # API URL (replace with your actual domain)
 API_URL = "https://midwaykebabish.ie/api/new-orders"
@@ -10,7 +12,7 @@ params = {
 
 try:
     # Make GET request
-    response = requests.get(API_URL, params=params)
+    response = get_session().get(API_URL, params=params)
     
     # Check if request was successful (HTTP 200)
     if response.status_code == 200:
@@ -22,11 +24,12 @@ try:
         
         # Print first order details (if available)
         if data["orders"]:
-            first_order = data["orders"][0]
+            first_order = Order.from_json(data["orders"][0])
             print("\n📦 First order details:")
-            print(f"Order ID: {first_order['id']}")
-            print(f"Status: {first_order['order_status']}")
-            print(f"User: {first_order['user_name']['name']}")  # Assuming 'userName' relation exists
+            print(f"Order ID: {first_order.id}")
+            print(f"Status: {first_order.status}")
+            print(f"User: {first_order.customer}")  # From the 'userName' relation
+            print(f"Amount: {first_order.amount_text()}")
         else:
             print("No new orders found.")
     else:
@@ -0,0 +1,263 @@
+import argparse
+import bisect
+import gzip
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for https://midwaykebabish.ie/api/new-orders so the
+# notifier can be run and tested offline.
+#
+#   python fake_server.py --port 8000 --rate 2
+#   NOTIFIER_API_URL=http://127.0.0.1:8000/api/new-orders python final.py
+#
+# Endpoints:
+#   GET  /api/new-orders?last_id=N[&wait=S]   poll (or long-poll with wait)
+#   GET  /api/new-orders/stream?last_id=N     Server-Sent Events stream
+#   POST /api/test-order                      add an order right now
+#
+# For benchmarks the feed can pad orders (--items, --padding) and the poll
+# endpoint can be made slow or flaky (--latency, --jitter, --error-rate,
+# --hang-rate, --malformed-rate).
+
+# =============== CONFIGURATION ===============
+HEARTBEAT = 15   # Seconds between SSE heartbeat comments
+MAX_WAIT = 60    # Upper bound for long-poll wait
+GZIP_MIN_SIZE = 256  # Compress JSON bodies larger than this
+NAMES = ["Aoife", "Sean", "Niamh", "Cian", "Saoirse", "Darragh", "Ciara", "Oisin"]
+MENU = ["Doner Kebab", "Chicken Tikka", "Garlic Chips", "Spice Bag", "Naan", "Can of Coke"]
+# ============================================
+
+
+def make_order(order_id, **overrides):
+    """Build an order shaped like the real API's"""
+    order = {
+        "id": order_id,
+        "user_name": {"name": random.choice(NAMES)},
+        "order_status": "pending",
+        "total_amount": f"{random.uniform(8, 60):.2f}",
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+    }
+    order.update(overrides)
+    return order
+
+
+class Faults:
+    """Latency and error injection for the poll endpoint"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, hang_rate=0.0,
+                 hang=30.0, malformed_rate=0.0):
+        self.latency = latency              # Seconds added to every answer
+        self.jitter = jitter                # +/- random extra seconds
+        self.error_rate = error_rate        # Fraction answered with HTTP 500
+        self.hang_rate = hang_rate          # Fraction that stall for `hang` seconds
+        self.hang = hang
+        self.malformed_rate = malformed_rate  # Fraction with a truncated JSON body
+        self.stats = {"requests": 0, "error": 0, "hang": 0, "malformed": 0}
+
+    def delay(self):
+        pause = self.latency + random.uniform(-self.jitter, self.jitter)
+        if pause > 0:
+            time.sleep(pause)
+
+    def pick(self):
+        """Decide what happens to one request: None, 'error', 'hang' or 'malformed'"""
+        self.stats["requests"] += 1
+        roll = random.random()
+        for fault, rate in (("error", self.error_rate), ("hang", self.hang_rate),
+                            ("malformed", self.malformed_rate)):
+            if roll < rate:
+                self.stats[fault] += 1
+                return fault
+            roll -= rate
+        return None
+
+
+class OrderFeed:
+    """In-memory order list shared by all request handlers"""
+
+    def __init__(self, items=0, padding=0):
+        self.orders = []
+        self.changed = threading.Condition()
+        self.items = items        # Line items per generated order
+        self.padding = padding    # Extra bytes of notes per generated order
+
+    @property
+    def last_id(self):
+        return self.orders[-1]["id"] if self.orders else 0
+
+    def add(self, **overrides):
+        with self.changed:
+            order = make_order(self.last_id + 1, **self._bulk(), **overrides)
+            self.orders.append(order)
+            self.changed.notify_all()
+        return order
+
+    def _bulk(self):
+        extra = {}
+        if self.items:
+            extra["items"] = [{"name": random.choice(MENU), "quantity": random.randint(1, 3),
+                               "price": f"{random.uniform(2, 12):.2f}"} for _ in range(self.items)]
+        if self.padding:
+            extra["notes"] = "x" * self.padding
+        return extra
+
+    def since(self, last_id):
+        # Ids only grow, so binary search instead of scanning every order
+        return self.orders[bisect.bisect_right(self.orders, last_id, key=lambda o: o["id"]):]
+
+    def wait_since(self, last_id, timeout):
+        """Block until there are orders newer than last_id or timeout expires"""
+        with self.changed:
+            self.changed.wait_for(lambda: self.last_id > last_id, timeout)
+            return self.since(last_id)
+
+    def payload(self, orders, last_id):
+        return {
+            "orders": orders,
+            "last_id": orders[-1]["id"] if orders else last_id,
+            "count": len(orders),
+        }
+
+
+def make_handler(feed, faults=None):
+    faults = faults or Faults()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass  # Keep the console quiet
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            last_id = int(query.get("last_id", ["0"])[0])
+
+            if url.path == "/api/new-orders":
+                fault = faults.pick()
+                faults.delay()
+                if fault == "hang":
+                    time.sleep(faults.hang)
+                if fault == "error":
+                    self.send_json(500, {"error": "injected failure"})
+                    return
+                wait = min(float(query.get("wait", ["0"])[0]), MAX_WAIT)
+                if wait:
+                    orders = feed.wait_since(last_id, wait)
+                else:
+                    orders = feed.since(last_id)
+                etag = f'"{last_id}-{feed.last_id}"'
+                if not orders and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if fault == "malformed":
+                    self.send_raw(200, json.dumps(feed.payload(orders, last_id)).encode()[:-7])
+                    return
+                self.send_json(200, feed.payload(orders, last_id), etag=etag)
+            elif url.path == "/api/new-orders/stream":
+                self.stream(last_id)
+            else:
+                self.send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            if urlparse(self.path).path != "/api/test-order":
+                self.send_json(404, {"error": "not found"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            overrides = json.loads(self.rfile.read(length) or b"{}")
+            self.send_json(201, feed.add(**overrides))
+
+        def send_json(self, status, body, etag=None):
+            self.send_raw(status, json.dumps(body).encode(), etag)
+
+        def send_raw(self, status, data, etag=None):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if etag:
+                self.send_header("ETag", etag)
+            if len(data) > GZIP_MIN_SIZE and "gzip" in self.headers.get("Accept-Encoding", ""):
+                data = gzip.compress(data)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def stream(self, last_id):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                while True:
+                    orders = feed.wait_since(last_id, HEARTBEAT)
+                    if orders:
+                        payload = feed.payload(orders, last_id)
+                        last_id = payload["last_id"]
+                        event = f"id: {last_id}\nevent: orders\ndata: {json.dumps(payload)}\n\n"
+                    else:
+                        event = ": heartbeat\n\n"
+                    self.write_chunk(event.encode())
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def write_chunk(self, data):
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+    return Handler
+
+
+def generate_orders(feed, rate, quiet=False, stop=None):
+    """Add orders at random, averaging `rate` per minute (until `stop` is set)"""
+    stop = stop or threading.Event()
+    while not stop.wait(random.expovariate(rate / 60.0)):
+        order = feed.add()
+        if not quiet:
+            print(f"+ order {order['id']} ({order['total_amount']})")
+
+
+def serve(port=8000, rate=0.0, host="127.0.0.1", feed=None, faults=None, quiet=False):
+    """Start the server in a background thread and return (server, feed)"""
+    feed = feed or OrderFeed()
+    server = ThreadingHTTPServer((host, port), make_handler(feed, faults))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    if rate > 0:
+        threading.Thread(target=generate_orders, args=(feed, rate, quiet), daemon=True).start()
+    return server, feed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake new-orders API for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--rate", type=float, default=1.0, help="Orders per minute (0 = manual only)")
+    parser.add_argument("--items", type=int, default=0, help="Line items per order")
+    parser.add_argument("--padding", type=int, default=0, help="Extra bytes per order")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each poll")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of polls answered 500")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of polls that stall")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction with broken JSON")
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.error_rate, args.hang_rate,
+                    malformed_rate=args.malformed_rate)
+    feed = OrderFeed(items=args.items, padding=args.padding)
+    server, _ = serve(args.port, args.rate, args.host, feed, faults)
+    print(f"Fake API on http://{args.host}:{server.server_port}/api/new-orders")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,57 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared keep-alive connection pool for every request the notifier makes.
+# Reusing one session means DNS, TCP connect and the TLS handshake are paid
+# once per host instead of on every poll.
+
+# =============== CONFIGURATION ===============
+POOL_CONNECTIONS = 4   # Number of hosts to keep a pool for
+POOL_MAXSIZE = 2       # Connections kept alive per host
+POOL_BLOCK = True      # Wait for a free connection instead of opening extras
+RETRY_TOTAL = 1        # Immediate retries on connect errors (5xx / timeouts: retry.py)
+USER_AGENT = "MidwayKebabishOrderNotifier/1.0"
+# ============================================
+
+_session = None
+
+
+def build_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE,
+                  pool_block=POOL_BLOCK):
+    """Create a session with pooled, retrying adapters"""
+    retry = Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=0,  # Never replay a request the server may have answered
+        status=0,  # Status retries are jittered and budgeted by retry.py
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=retry,
+    )
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({"User-Agent": USER_AGENT, "Connection": "keep-alive"})
+    return s
+
+
+def get_session():
+    """Return the process-wide shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        _session = build_session()
+    return _session
+
+
+def close_session():
+    """Close all pooled connections (call on shutdown)"""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
@@ -0,0 +1,288 @@
+import ipaddress
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+import metrics
+
+# Local order hub: one upstream poll feeds any number of screens.
+#
+# Kitchen displays, tablets and printer daemons connect over plain TCP and
+# get every new order as newline-delimited JSON:
+#   client -> {"since": 1234, "token": "..."}     optional first line
+#   hub    -> {"event": "hello", "last_id": 1240, "oldest_id": 1001}
+#   hub    -> {"event": "order", "order": {...Order.to_dict()...}}
+#   hub    -> {"event": "gap", "after_id": 900, "next_id": 1001}
+#   hub    -> {"event": "ping"}                    every PING_INTERVAL when idle
+# With "since", the subscriber first gets the orders after that id from
+# the hub's backlog (the last BACKLOG orders); without it, only new orders.
+#
+# Every subscriber has its own writer thread and a cursor into the shared
+# backlog, so a slow screen only delays itself: it catches up from the
+# backlog, gets a "gap" event if it fell further behind than the backlog
+# reaches, and is dropped if one write blocks for SEND_TIMEOUT. Each order
+# is encoded once however many subscribers there are.
+#
+# Orders carry customer names, so without HUB_TOKEN (NOTIFIER_HUB_TOKEN) the
+# hub only listens on, and only serves, this machine; set a token to stream
+# to other devices on the shop LAN.
+#
+# Try it with `python hub.py --connect 127.0.0.1:8765 --since 0`, which also
+# serves as a starting point for a printer daemon.
+
+# =============== CONFIGURATION ===============
+HUB_HOST = None           # None: the shop LAN with a token, this machine only without
+HUB_PORT = 8765
+BACKLOG = 1000            # Orders kept for resuming subscribers
+SEND_TIMEOUT = 10         # Drop a subscriber whose socket stays full this long
+HELLO_TIMEOUT = 1.0       # Wait this long for the optional first line
+PING_INTERVAL = 15        # Keep-alive line when there is nothing to send
+HUB_TOKEN = os.environ.get("NOTIFIER_HUB_TOKEN", "")  # Required in the first line if set
+# ============================================
+
+PUBLISHED = metrics.counter("notifier_hub_orders_total", "Orders published to the hub")
+DROPPED = metrics.counter("notifier_hub_dropped_total", "Subscribers dropped for not reading")
+GAPS = metrics.counter("notifier_hub_gaps_total", "Subscribers that fell behind the backlog")
+
+
+def _line(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _is_local(host):
+    address = ipaddress.ip_address(host.split("%")[0])
+    return address.is_loopback or bool(getattr(address, "ipv4_mapped", None)
+                                       and address.ipv4_mapped.is_loopback)
+
+
+class Subscriber:
+    """One connected client and its position in the backlog"""
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.host = address[0]
+        self.address = f"{address[0]}:{address[1]}"
+        self.cursor = None   # Sequence number of the last entry sent
+        self.last_id = None  # Last order id sent (or the client's `since`)
+        self.sent = 0
+
+
+class OrderHub:
+    """Broadcasts new orders to TCP subscribers as NDJSON"""
+
+    def __init__(self, host=HUB_HOST, port=HUB_PORT, backlog=BACKLOG, token=HUB_TOKEN,
+                 report=print):
+        self.host = host or ("0.0.0.0" if token else "127.0.0.1")
+        self.port = port
+        self.token = token
+        self.report = report
+        self.backlog = deque(maxlen=backlog)   # (seq, order id, encoded line)
+        self.seq = 0
+        self.subscribers = set()
+        self.stats = {"published": 0, "connected": 0, "dropped": 0, "gaps": 0, "rejected": 0}
+        if not token and self.host not in ("127.0.0.1", "::1", "localhost"):
+            report("Order hub has no token: only subscribers on this machine are served")
+        self._changed = threading.Condition()
+        self._server = None
+        metrics.gauge("notifier_hub_subscribers", "Connected hub subscribers",
+                      lambda: len(self.subscribers))
+
+    # ---------- Publishing ----------
+
+    def publish(self, orders):
+        """Queue orders for every subscriber (never blocks on them)"""
+        lines = [(order.id, _line({"event": "order", "order": order.to_dict()})) for order in orders]
+        if not lines:
+            return
+        with self._changed:
+            for order_id, line in lines:
+                self.seq += 1
+                self.backlog.append((self.seq, order_id, line))
+            self._changed.notify_all()
+        self.stats["published"] += len(lines)
+        PUBLISHED.inc(len(lines))
+
+    # ---------- Serving ----------
+
+    def start(self):
+        """Listen on a daemon thread; False if the port can't be bound"""
+        try:
+            self._server = socket.create_server((self.host, self.port), reuse_port=False)
+        except OSError as e:
+            self.report(f"Order hub disabled ({self.host}:{self.port}: {e})")
+            return False
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, name="hub-accept", daemon=True).start()
+        self.report(f"Order hub streaming to displays on port {self.port}")
+        return True
+
+    def stop(self):
+        if self._server:
+            self._server.close()
+        with self._changed:
+            for subscriber in self.subscribers:
+                subscriber.sock.close()
+            self.subscribers.clear()
+            self._changed.notify_all()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self._server.accept()
+            except OSError:
+                return  # Server closed
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(Subscriber(sock, address),),
+                             name="hub-subscriber", daemon=True).start()
+
+    def _hello(self, subscriber):
+        """Read the optional first line; returns the `since` id, or None for live only"""
+        subscriber.sock.settimeout(HELLO_TIMEOUT)
+        data = b""
+        try:
+            while b"\n" not in data and len(data) < 4096:
+                chunk = subscriber.sock.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        except OSError:
+            pass  # No first line: a plain live subscriber
+        request = {}
+        if data.strip():
+            try:
+                request = json.loads(data.split(b"\n")[0])
+            except ValueError:
+                request = {}
+            if isinstance(request, int):
+                request = {"since": request}
+            if not isinstance(request, dict):
+                request = {}
+        if self.token and request.get("token") != self.token:
+            raise PermissionError("bad or missing token")
+        since = request.get("since")
+        return int(since) if since is not None else None
+
+    def _serve(self, subscriber):
+        joined = self.seq  # Live subscribers get what is published from now on
+        if not self.token and not _is_local(subscriber.host):
+            self.stats["rejected"] += 1
+            self._close(subscriber, "rejected (no hub token set: this machine only)")
+            return
+        try:
+            since = self._hello(subscriber)
+        except (PermissionError, ValueError, TypeError) as e:
+            self.stats["rejected"] += 1
+            self._close(subscriber, f"rejected ({e})")
+            return
+
+        subscriber.last_id = since
+        with self._changed:
+            if since is None:
+                subscriber.cursor = joined
+            else:
+                # Resume: everything in the backlog after the last id the client saw
+                subscriber.cursor = next((seq - 1 for seq, order_id, _ in self.backlog
+                                          if order_id > since), self.seq)
+                if self.backlog and since < self.backlog[0][1] - 1:
+                    subscriber.cursor = -1  # Older than the backlog: _next_lines reports the gap
+            oldest = self.backlog[0][1] if self.backlog else None
+            newest = self.backlog[-1][1] if self.backlog else None
+            self.subscribers.add(subscriber)
+        self.stats["connected"] += 1
+        self.report(f"Display connected: {subscriber.address}")
+
+        subscriber.sock.settimeout(SEND_TIMEOUT)
+        try:
+            subscriber.sock.sendall(_line({"event": "hello", "last_id": newest, "oldest_id": oldest}))
+            while True:
+                lines = self._next_lines(subscriber)
+                subscriber.sock.sendall(b"".join(lines) if lines else _line({"event": "ping"}))
+                subscriber.sent += len(lines)
+        except socket.timeout:
+            self.stats["dropped"] += 1
+            DROPPED.inc()
+            self._close(subscriber, f"dropped: not reading for {SEND_TIMEOUT}s")
+        except OSError:
+            self._close(subscriber, "disconnected")
+
+    def _next_lines(self, subscriber):
+        """Lines after the subscriber's cursor (empty after PING_INTERVAL idle)"""
+        with self._changed:
+            if subscriber.cursor >= self.seq:
+                self._changed.wait(PING_INTERVAL)
+            if subscriber not in self.subscribers:
+                raise OSError("hub stopped")
+            if not self.backlog:
+                return []
+            first = self.backlog[0][0]
+            gap = subscriber.cursor < first - 1  # Behind what the backlog still holds
+            entries = list(self.backlog)[max(subscriber.cursor - first + 1, 0):]
+        lines = [line for _, _, line in entries]
+        if gap:
+            self.stats["gaps"] += 1
+            GAPS.inc()
+            lines.insert(0, _line({"event": "gap", "after_id": subscriber.last_id,
+                                   "next_id": entries[0][1]}))
+        if entries:
+            subscriber.cursor, subscriber.last_id = entries[-1][0], entries[-1][1]
+        return lines
+
+    def _close(self, subscriber, why):
+        with self._changed:
+            present = subscriber in self.subscribers
+            self.subscribers.discard(subscriber)
+        try:
+            subscriber.sock.close()
+        except OSError:
+            pass
+        if present:
+            self.report(f"Display {subscriber.address} {why} after {subscriber.sent} orders")
+
+
+def subscribe(host, port, since=None, token=HUB_TOKEN):
+    """Yield hub messages; a minimal client for displays and printer daemons"""
+    with socket.create_connection((host, port)) as sock:
+        hello = {}
+        if since is not None:
+            hello["since"] = since
+        if token:
+            hello["token"] = token
+        if hello:
+            sock.sendall(_line(hello))
+        with sock.makefile("rb") as lines:
+            for line in lines:
+                yield json.loads(line)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print orders streamed by a notifier's hub")
+    parser.add_argument("--connect", default=f"127.0.0.1:{HUB_PORT}", help="host:port of the hub")
+    parser.add_argument("--since", type=int, help="Resume after this order id")
+    args = parser.parse_args()
+
+    host, _, port = args.connect.rpartition(":")
+    last_id = args.since
+    while True:
+        try:
+            for message in subscribe(host, int(port), last_id):
+                if message["event"] == "order":
+                    order = message["order"]
+                    last_id = order["id"]
+                    print(f"#{order['id']} {order['customer'] or 'N/A'} {order['status'] or ''}"
+                          f" {order['order_type'] or ''} {len(order['items'])} item(s)")
+                elif message["event"] == "gap":
+                    print(f"Missed orders between {message['after_id']} and {message['next_id']}")
+        except (OSError, ValueError) as e:
+            print(f"Hub connection lost ({e}); reconnecting from {last_id}")
+            time.sleep(2)
+        except KeyboardInterrupt:
+            return
+
+
+if __name__ == "__main__":
+    main()
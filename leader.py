@@ -0,0 +1,337 @@
+import hashlib
+import hmac
+import json
+import os
+import socket
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+
+import metrics
+from order import Order
+from priority import SCHEDULE_FIELDS
+
+# LAN leader election: one terminal per shop polls the API.
+#
+# The till, kitchen and office machines all run the notifier, but only one
+# of them needs to talk to the API. Terminals announce themselves with UDP
+# multicast heartbeats on GROUP:PORT (TTL 1, so nothing leaves the LAN
+# segment). Among the terminals heard in the last PEER_TIMEOUT seconds:
+#   - a terminal that already leads keeps leading, so a machine that
+#     restarts or joins doesn't cause a handover
+#   - with no live leader, the lowest node id takes over, after listening
+#     for ELECTION_WAIT so a freshly started terminal hears the others first
+#   - if two leaders meet (a network split heals), the higher id steps down
+# Until the first election is settled a terminal polls anyway, so startup
+# stays fast; at worst the API sees one extra poll.
+#
+# The leader polls as usual and relays every batch of new orders to the
+# group. Followers don't poll: relayed orders go through their normal order
+# handling (dedupe, store, checkpoint, alerts), so their last_id is current
+# when they take over. Heartbeats carry the leader's last_id; a follower
+# that is behind (a lost datagram) asks for a resend of the leader's
+# RELAY_BACKLOG most recent orders.
+#
+# Messages are JSON signed with HMAC-SHA256 under LAN_KEY (set with
+# NOTIFIER_LAN_KEY, the same secret on every terminal of the shop) mixed
+# with the API URL, which also keeps shops that share a LAN apart. Without
+# a key there is no election: anything on the LAN (a guest Wi-Fi client)
+# could otherwise claim to lead and silence the terminals, or inject orders.
+# Every message carries the sender's clock and a sequence number; messages
+# more than MAX_CLOCK_SKEW old, or not newer than the last one from that
+# terminal, are rejected, so a captured heartbeat can't be replayed.
+#
+# Order datagrams are packed up to MAX_DATAGRAM bytes. An order too big for
+# one on its own is sent without its extra API fields (bar the scheduled
+# time priority.py needs); send failures are counted and reported.
+#
+# To try it on one machine, start fake_server.py and two or three
+#   NOTIFIER_LAN_KEY=secret NOTIFIER_API_URL=http://127.0.0.1:8000/api/new-orders python final.py
+# then kill the one that polls. `python leader.py` lists the terminals heard.
+
+# =============== CONFIGURATION ===============
+GROUP = "239.255.42.99"   # Multicast group (administratively scoped)
+PORT = 50999
+HEARTBEAT = 1.0           # Seconds between heartbeats
+PEER_TIMEOUT = 3.5        # A terminal not heard for this long is gone
+ELECTION_WAIT = 2.5       # Listen this long after startup before claiming
+RELAY_BATCH = 20          # Orders per datagram, at most ...
+MAX_DATAGRAM = 8192       # ... and bytes per datagram (well below the UDP limit)
+MAX_CLOCK_SKEW = 120      # Seconds; older (or future) messages are rejected as replays
+RELAY_BACKLOG = 500       # Recent orders the leader can resend
+RESEND_INTERVAL = 2.0     # Don't ask for a resend more often than this
+LAN_KEY = os.environ.get("NOTIFIER_LAN_KEY", "")  # Shared secret; no election without it
+# ============================================
+
+RELAYED = metrics.counter("notifier_lan_relayed_orders_total", "Orders relayed to other terminals")
+RECEIVED = metrics.counter("notifier_lan_received_orders_total", "Orders received from the leader")
+TAKEOVERS = metrics.counter("notifier_lan_takeovers_total", "Times this terminal became the poller")
+REJECTED = metrics.counter("notifier_lan_rejected_total", "LAN messages with a bad signature or replayed")
+SEND_ERRORS = metrics.counter("notifier_lan_send_errors_total", "LAN datagrams that couldn't be sent")
+
+
+def _node_id():
+    """Sortable and unique: hostname first, so the same machine tends to lead"""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class LanLeader:
+    """Elects one poller among the terminals of a shop and relays its orders"""
+
+    def __init__(self, api_url, on_orders, get_last_id, key=LAN_KEY, group=GROUP,
+                 port=PORT, node_id=None, report=print):
+        self.on_orders = on_orders        # on_orders(orders, last_id), like a push batch
+        self.get_last_id = get_last_id
+        self.key = hashlib.sha256(f"{key}\n{api_url}".encode()).digest() if key else None
+        self.group = group
+        self.port = port
+        self.node = node_id or _node_id()
+        self.report = report
+        self.leading = False
+        self.leader = None                # Node id of the current leader (maybe us)
+        self.peers = {}                   # Node -> (last heard, leading, last_id)
+        self.backlog = deque(maxlen=RELAY_BACKLOG)
+        self.stats = {"takeovers": 0, "relayed": 0, "received": 0, "resends": 0, "rejected": 0,
+                      "replayed": 0, "send_errors": 0}
+        self.started = None
+        self.seq = 0
+        self.last_seq = {}                # Node -> (last sequence number, sent at)
+        self._send_failing = False
+        self._asked_at = 0.0
+        self._sock = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    # ---------- Public ----------
+
+    @property
+    def polling(self):
+        """True if this terminal should poll the API"""
+        if self.started is None:
+            return True  # Not running: a lone terminal
+        with self._lock:
+            if self.leading:
+                return True
+            return self.leader is None and time.monotonic() - self.started < ELECTION_WAIT
+
+    def start(self):
+        """Join the group and run the election on a daemon thread; False if the LAN is unusable"""
+        if self.key is None:
+            self.report("LAN election disabled (set NOTIFIER_LAN_KEY); this terminal polls on its own")
+            return False
+        try:
+            self._sock = self._open()
+        except OSError as e:
+            self.report(f"LAN election disabled ({e}); this terminal polls on its own")
+            return False
+        self.started = time.monotonic()
+        threading.Thread(target=self._run, name="lan-leader", daemon=True).start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def relay(self, orders, last_id):
+        """Send new orders to the followers (only when leading)"""
+        if not orders or not self.leading:
+            return
+        records = [order.to_dict() for order in orders]
+        with self._lock:
+            self.backlog.extend(records)
+        self._send_orders(records, last_id)
+        self.stats["relayed"] += len(records)
+        RELAYED.inc(len(records))
+
+    def snapshot(self):
+        """Current state, for logging or inspection"""
+        now = time.monotonic()
+        with self._lock:
+            peers = {node: {"age": round(now - seen, 1), "leading": leading, "last_id": last_id}
+                     for node, (seen, leading, last_id) in self.peers.items()}
+        return {"node": self.node, "leading": self.leading, "leader": self.leader,
+                "peers": peers, **self.stats}
+
+    # ---------- Network ----------
+
+    def _open(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", self.port))
+        membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton("0.0.0.0"))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)  # Terminals on one host
+        return sock
+
+    def _send(self, message):
+        """Sign and send one message; False (counted, reported) if it couldn't go out"""
+        self.seq += 1
+        message.update(node=self.node, seq=self.seq, ts=round(time.time(), 3))
+        payload = json.dumps(message, separators=(",", ":")).encode()
+        signature = hmac.new(self.key, payload, hashlib.sha256).digest()
+        try:
+            self._sock.sendto(signature + payload, (self.group, self.port))
+        except OSError as e:
+            self.stats["send_errors"] += 1
+            SEND_ERRORS.inc()
+            # Orders always; heartbeats only when they start failing (e.g. the LAN is down)
+            if message["t"] == "orders" or not self._send_failing:
+                self.report(f"Couldn't send LAN {message['t']} message ({len(payload)} bytes): {e}")
+            self._send_failing = True
+            return False
+        self._send_failing = False
+        return True
+
+    def _send_orders(self, records, last_id):
+        """Send records in datagrams of at most RELAY_BATCH orders and MAX_DATAGRAM bytes"""
+        batch, size = [], 0
+        for record in records:
+            encoded = len(json.dumps(record, separators=(",", ":")).encode())
+            if encoded > MAX_DATAGRAM and record.get("extra"):
+                record = dict(record, extra={k: v for k, v in record["extra"].items()
+                                             if k in SCHEDULE_FIELDS})
+                encoded = len(json.dumps(record, separators=(",", ":")).encode())
+            if batch and (len(batch) >= RELAY_BATCH or size + encoded > MAX_DATAGRAM):
+                # Only the final datagram moves followers to last_id; stop at a failure so
+                # they stay behind it and ask for a resend
+                if not self._send({"t": "orders", "orders": batch, "last_id": batch[-1]["id"]}):
+                    return
+                batch, size = [], 0
+            batch.append(record)
+            size += encoded + 1
+        # At least one datagram, so a resend with nothing to resend still moves last_id
+        self._send({"t": "orders", "orders": batch, "last_id": last_id})
+
+    def _receive(self, timeout):
+        self._sock.settimeout(max(timeout, 0.01))
+        try:
+            data, _ = self._sock.recvfrom(65535)
+        except OSError:
+            return None  # Timed out, or the socket is gone
+        signature, payload = data[:32], data[32:]
+        if not hmac.compare_digest(signature, hmac.new(self.key, payload, hashlib.sha256).digest()):
+            self.stats["rejected"] += 1
+            REJECTED.inc()
+            return None
+        try:
+            message = json.loads(payload)
+            node, seq, sent = message["node"], int(message["seq"]), float(message["ts"])
+        except (ValueError, KeyError, TypeError):
+            return None
+        if node == self.node:
+            return None  # Our own datagram, looped back
+        now = time.time()
+        if abs(now - sent) > MAX_CLOCK_SKEW or seq <= self.last_seq.get(node, (0, 0))[0]:
+            self.stats["replayed"] += 1
+            REJECTED.inc()
+            return None  # Replayed, or a terminal whose clock is far off
+        self.last_seq[node] = (seq, sent)
+        for old in [n for n, (_, at) in self.last_seq.items() if now - at > MAX_CLOCK_SKEW]:
+            del self.last_seq[old]  # Anything it sent is now rejected by age anyway
+        return message
+
+    # ---------- Election ----------
+
+    def _run(self):
+        next_beat = time.monotonic()
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if now >= next_beat:
+                self._send({"t": "hb", "leading": self.leading, "last_id": self.get_last_id()})
+                self._elect()
+                next_beat = now + HEARTBEAT
+            message = self._receive(next_beat - time.monotonic())
+            if message:
+                try:
+                    self._handle(message)
+                except (KeyError, TypeError, ValueError) as e:
+                    self.report(f"Bad LAN message from {message.get('node')}: {e!r}")
+
+    def _handle(self, message):
+        node, kind = message["node"], message.get("t")
+        if kind == "hb":
+            with self._lock:
+                self.peers[node] = (time.monotonic(), bool(message.get("leading")), message.get("last_id"))
+            if message.get("leading"):
+                self._elect()
+                if node == self.leader and (message.get("last_id") or 0) > self.get_last_id():
+                    self._ask_resend()
+        elif kind == "orders" and node == self.leader and not self.leading:
+            orders = [Order.from_dict(record) for record in message["orders"]]
+            self.stats["received"] += len(orders)
+            RECEIVED.inc(len(orders))
+            self.on_orders(orders, int(message.get("last_id") or 0))
+        elif kind == "resend" and self.leading:
+            since = int(message.get("since") or 0)
+            with self._lock:
+                records = [record for record in self.backlog if record["id"] > since]
+            self.stats["resends"] += 1
+            self._send_orders(records, self.get_last_id())
+
+    def _ask_resend(self):
+        now = time.monotonic()
+        if now - self._asked_at >= RESEND_INTERVAL:
+            self._asked_at = now
+            self._send({"t": "resend", "since": self.get_last_id()})
+
+    def _elect(self):
+        now = time.monotonic()
+        with self._lock:
+            for node in [n for n, (seen, _, _) in self.peers.items() if now - seen > PEER_TIMEOUT]:
+                del self.peers[node]
+            leaders = sorted(node for node, (_, leading, _) in self.peers.items() if leading)
+            was_leading, was_leader = self.leading, self.leader
+            if self.leading:
+                if leaders and leaders[0] < self.node:
+                    self.leading, self.leader = False, leaders[0]  # Two leaders: lowest id stays
+            elif leaders:
+                self.leader = leaders[0]
+            elif now - self.started >= ELECTION_WAIT and all(self.node < n for n in self.peers):
+                self.leading, self.leader = True, self.node
+            else:
+                self.leader = None  # Waiting for a lower id to claim
+        if self.leading and not was_leading:
+            self.stats["takeovers"] += 1
+            TAKEOVERS.inc()
+            self.report(f"📡 This terminal now polls the API for the shop ({len(self.peers)} other terminal(s))")
+        elif self.leader != was_leader and self.leader is not None and not self.leading:
+            self.report(f"📡 Following {self.leader}: orders come from that terminal")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List the notifier terminals heard on the LAN")
+    parser.add_argument("--url", default=os.environ.get("NOTIFIER_API_URL",
+                                                        "https://midwaykebabish.ie/api/new-orders"),
+                        help="API URL the terminals poll (part of the message key)")
+    parser.add_argument("--key", default=LAN_KEY, help="Shared LAN key (default: NOTIFIER_LAN_KEY)")
+    parser.add_argument("--seconds", type=float, default=PEER_TIMEOUT, help="How long to listen")
+    args = parser.parse_args()
+    if not args.key:
+        parser.error("set NOTIFIER_LAN_KEY or pass --key")
+
+    lan = LanLeader(args.url, lambda orders, last_id: None, lambda: 0, key=args.key,
+                    report=lambda message: None)
+    lan.started = time.monotonic()
+    lan._sock = lan._open()
+    deadline = time.monotonic() + args.seconds
+    while time.monotonic() < deadline:
+        message = lan._receive(deadline - time.monotonic())
+        if message and message.get("t") == "hb":  # Only listen: never claim or ask for resends
+            lan.peers[message["node"]] = (time.monotonic(), bool(message.get("leading")),
+                                          message.get("last_id"))
+    peers = lan.snapshot()["peers"]
+    if not peers:
+        print("No terminals heard")
+    for node, peer in sorted(peers.items()):
+        role = "polling" if peer["leading"] else "following"
+        print(f"{node:40} {role:10} last_id={peer['last_id']}  heard {peer['age']}s ago")
+
+
+if __name__ == "__main__":
+    main()
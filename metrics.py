@@ -0,0 +1,279 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# In-process metrics for the notifier.
+#
+# Histograms and counters are kept in memory and exposed two ways:
+#   - Prometheus text format on http://127.0.0.1:METRICS_PORT/metrics
+#   - a one-line summary every SUMMARY_INTERVAL seconds (printed, or handed
+#     to whatever `report` callable the script passes to start())
+#
+# orders_api.py records poll round-trip and decode times, alerts.py records
+# order-to-alert latency; the scripts time sound / notification dispatch and
+# count errors. Components register a snapshot() with detail(): all of them
+# are served as JSON on http://127.0.0.1:METRICS_PORT/status, and the optional
+# brief form is appended to the summary line.
+
+# =============== CONFIGURATION ===============
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464          # 0 = don't serve the endpoint
+SUMMARY_INTERVAL = 300       # Seconds between summary lines (0 = never)
+# ============================================
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+ALERT_BUCKETS = (1, 2, 5, 10, 15, 30, 45, 60, 120, 300, 600, 1800)
+
+_registry = []
+_details = {}   # name -> (snapshot, brief)
+_lock = threading.Lock()
+
+
+class Counter:
+    """Monotonic count"""
+
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, n=1):
+        with _lock:
+            self.value += n
+
+    def samples(self):
+        return [(self.name, self.value)]
+
+
+class Gauge:
+    """Value read from a callable when scraped"""
+
+    kind = "gauge"
+
+    def __init__(self, name, help, func):
+        self.name = name
+        self.help = help
+        self.func = func
+
+    @property
+    def value(self):
+        try:
+            return self.func()
+        except Exception:
+            return float("nan")
+
+    def samples(self):
+        return [(self.name, self.value)]
+
+
+class Histogram:
+    """Fixed-bucket histogram with approximate percentiles"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        with _lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th quantile (None if empty)"""
+        with _lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        rank, seen = q * total, 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def samples(self):
+        with _lock:
+            counts, total, sum_ = list(self.counts), self.count, self.sum
+        lines, cumulative = [], 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            lines.append((f'{self.name}_bucket{{le="{bound}"}}', cumulative))
+        lines.append((f'{self.name}_bucket{{le="+Inf"}}', total))
+        lines.append((f"{self.name}_sum", round(sum_, 6)))
+        lines.append((f"{self.name}_count", total))
+        return lines
+
+
+def _register(metric):
+    with _lock:
+        _registry[:] = [m for m in _registry if m.name != metric.name]
+        _registry.append(metric)
+    return metric
+
+
+def counter(name, help):
+    return _register(Counter(name, help))
+
+
+def histogram(name, help, buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, help, buckets))
+
+
+def gauge(name, help, func):
+    return _register(Gauge(name, help, func))
+
+
+def detail(name, snapshot, brief=None):
+    """Serve snapshot() on /status; brief() (a short string) goes in the summary line"""
+    with _lock:
+        _details[name] = (snapshot, brief)
+
+
+def _call(func):
+    try:
+        return func()
+    except Exception as e:
+        return f"unavailable ({e!r})"
+
+
+def status():
+    """Every registered snapshot, as JSON text"""
+    with _lock:
+        details = dict(_details)
+    return json.dumps({name: _call(snapshot) for name, (snapshot, _) in details.items()},
+                      indent=2, default=str) + "\n"
+
+
+# Standard notifier metrics
+POLLS = counter("notifier_polls_total", "Order polls sent")
+EMPTY_POLLS = counter("notifier_empty_polls_total", "Polls that returned no new orders")
+ERRORS = counter("notifier_errors_total", "Failed polls (network, HTTP or bad response)")
+ORDERS = counter("notifier_orders_total", "Orders received")
+ALERTS = counter("notifier_alerts_total", "Alerts delivered")
+POLL_RTT = histogram("notifier_poll_seconds", "Poll round-trip time up to the response headers")
+DECODE_TIME = histogram("notifier_decode_seconds", "Time spent decoding the orders JSON")
+ALERT_LATENCY = histogram("notifier_order_to_alert_seconds",
+                          "Order created_at to alert delivered", ALERT_BUCKETS)
+NOTIFY_TIME = histogram("notifier_notification_seconds", "Desktop notification dispatch time")
+SOUND_TIME = histogram("notifier_sound_seconds", "Sound playback dispatch time")
+
+
+@contextmanager
+def timed(hist):
+    """Observe the duration of the with-block, even if it raises"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        hist.observe(time.perf_counter() - started)
+
+
+def record_alert(alert):
+    """Count a delivered alert and the age of each order in it"""
+    ALERTS.inc()
+    now = datetime.now(timezone.utc)
+    for order in alert.orders:
+        created = order.created_at
+        if created is None:
+            continue
+        if created.tzinfo is None:
+            created = created.astimezone()  # Naive timestamps are local time
+        ALERT_LATENCY.observe(max((now - created).total_seconds(), 0.0))
+
+
+def render():
+    """All metrics in Prometheus text exposition format"""
+    with _lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(f"{name} {value}" for name, value in metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def _ms(seconds):
+    if seconds is None:
+        return "-"
+    if seconds == float("inf"):
+        return "inf"
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:g}s"
+
+
+def summary():
+    """One-line overview of the counters and p50/p95 of each histogram"""
+    parts = [f"polls={POLLS.value} empty={EMPTY_POLLS.value} errors={ERRORS.value}"
+             f" orders={ORDERS.value} alerts={ALERTS.value}"]
+    for label, hist in (("rtt", POLL_RTT), ("decode", DECODE_TIME),
+                        ("order->alert", ALERT_LATENCY), ("notify", NOTIFY_TIME),
+                        ("sound", SOUND_TIME)):
+        if hist.count:
+            parts.append(f"{label} p50={_ms(hist.percentile(0.5))} p95={_ms(hist.percentile(0.95))}")
+    with _lock:
+        gauges = [m for m in _registry if m.kind == "gauge"]
+    for g in gauges:
+        parts.append(f"{g.name.replace('notifier_', '')}={g.value}")
+    with _lock:
+        briefs = [(name, brief) for name, (_, brief) in _details.items() if brief]
+    parts.extend(f"{name}: {_call(brief)}" for name, brief in briefs)
+    return " | ".join(parts)
+
+
+def serve(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics on a daemon thread; returns the server (None if it can't bind)"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Only when serving
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            if path == "/status":
+                body, content_type = status().encode("utf-8"), "application/json"
+            elif path in ("/", "/metrics"):
+                body, content_type = render().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes are not worth a console line
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:
+        print(f"Metrics endpoint disabled ({host}:{port}: {e})")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start(port=METRICS_PORT, interval=SUMMARY_INTERVAL, report=print):
+    """Start the endpoint and the periodic summary line"""
+    server = serve(port) if port else None
+    if interval:
+        def loop():
+            while True:
+                time.sleep(interval)
+                report(summary())
+        threading.Thread(target=loop, name="metrics-summary", daemon=True).start()
+    return server
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+import http_session
+import metrics
+import probe
+from checkpoint import Checkpoint
+from connectivity import Connectivity
+from dedupe import SeenOrders
+from drivers import Notify, Sound
+from order_log import OrderLog
+from orders_api import OrdersClient
+from scheduler import AdaptiveScheduler
+
+# Poll many store endpoints from one process and one event loop.
+#
+#   python multistore.py stores.json
+#
+# stores.json is a list of stores, e.g.
+#   [{"name": "Midway", "api_url": "https://midwaykebabish.ie/api/new-orders",
+#     "interval": 30, "alerts": ["console", "notify", "sound"]}]
+#
+# Each store keeps its own last_id (checkpointed to last_id-<name>.json in
+# probe.DATA_DIR, with the same catch-up age cap as notifier.py), adaptive
+# interval and connectivity state. HTTP calls are blocking (requests), so
+# they run on a small worker pool whose size is the concurrency limit;
+# everything else happens on the event loop.
+
+# =============== CONFIGURATION ===============
+STORES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stores.json")
+MAX_CONCURRENCY = 8     # Requests in flight at once across all stores
+ALERT_WORKERS = 2       # Threads used for notifications / sounds / logs
+SOUND_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "play.wav")
+LOG_FILE = "order_log.jsonl"   # In probe.DATA_DIR unless absolute
+# ============================================
+
+
+def alert_console(store, orders):
+    print(f"\n🔔 [{store.name}] {len(orders)} new order(s) received!")
+    for order in orders:
+        print(f"  #{order.id} {order.customer or 'N/A'} {order.status or 'N/A'} {order.amount_text()}")
+
+
+_notify = Notify("Midway Kebabish Order Notifier")
+_sound = None
+
+
+def alert_notify(store, orders):
+    try:
+        _notify.show(f"New Orders - {store.name}", f"{len(orders)} new order(s) received!")
+    except Exception as e:
+        print(f"Couldn't show notification: {e}")
+
+
+def alert_sound(store, orders):
+    global _sound
+    if _sound is None:
+        _sound = Sound(SOUND_FILE)
+    try:
+        _sound.play()
+    except Exception as e:
+        print(f"Couldn't play sound: {e}")
+
+
+_order_log = None
+
+
+def alert_log(store, orders):
+    global _order_log
+    if _order_log is None:
+        _order_log = OrderLog(probe.data_path(LOG_FILE))
+    for order in orders:
+        _order_log.log_order(order, store=store.name)
+
+
+ALERT_ROUTES = {
+    "console": alert_console,
+    "notify": alert_notify,
+    "sound": alert_sound,
+    "log": alert_log,
+}
+
+
+class Store:
+    """Per-store polling state"""
+
+    def __init__(self, name, api_url, interval=30, alerts=("console",), last_id=0):
+        unknown = [a for a in alerts if a not in ALERT_ROUTES]
+        if unknown:
+            raise ValueError(f"Store {name}: unknown alert route(s) {unknown}")
+        self.name = name
+        self.api = OrdersClient(api_url)
+        self.alerts = [ALERT_ROUTES[a] for a in alerts]
+        slug = re.sub(r"[^\w.-]+", "_", name)
+        self.checkpoint = Checkpoint(probe.data_path(f"last_id-{slug}.json"))
+        self.last_id = self.checkpoint.load() or last_id
+        self.seen = SeenOrders()
+        self.scheduler = AdaptiveScheduler(base_interval=interval)
+        self.connection = Connectivity(
+            on_lost=lambda e: print(f"⚠️ [{name}] Connection lost ({e})"),
+            on_restored=lambda: print(f"✅ [{name}] Connection restored"),
+        )
+
+
+def load_stores(path=STORES_FILE):
+    with open(path) as f:
+        return [Store(**entry) for entry in json.load(f)]
+
+
+class MultiStorePoller:
+    """Runs one polling task per store on a single event loop"""
+
+    def __init__(self, stores, max_concurrency=MAX_CONCURRENCY):
+        self.stores = stores
+        self.max_concurrency = max_concurrency
+        # A pool per store host, each with room for every request in flight, so
+        # stores on one host aren't serialised behind a small blocking pool
+        hosts = {urlsplit(store.api.url).netloc for store in stores}
+        self.session = http_session.build_session(
+            pool_connections=max(http_session.POOL_CONNECTIONS, len(hosts)),
+            pool_maxsize=max(http_session.POOL_MAXSIZE, max_concurrency))
+        for store in stores:
+            store.api.session = self.session
+        self.http_pool = ThreadPoolExecutor(max_concurrency, thread_name_prefix="http")
+        self.alert_pool = ThreadPoolExecutor(ALERT_WORKERS, thread_name_prefix="alert")
+        self.limiter = None
+
+    async def run(self):
+        self.limiter = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.gather(*(self.poll_forever(store) for store in self.stores))
+        finally:
+            self.http_pool.shutdown(wait=False)
+            self.alert_pool.shutdown(wait=False)
+            self.session.close()
+
+    async def poll_forever(self, store):
+        while True:
+            try:
+                if store.connection.allow_request():
+                    await self.poll(store)
+            except Exception as e:  # One broken store must not stop the others
+                metrics.ERRORS.inc()
+                print(f"[{store.name}] Unexpected error: {e!r}")
+            await asyncio.sleep(store.scheduler.next_interval())
+
+    async def poll(self, store):
+        loop = asyncio.get_running_loop()
+        try:
+            async with self.limiter:
+                response = await loop.run_in_executor(
+                    self.http_pool, store.api.get_new_orders, store.last_id)
+        except requests.exceptions.RequestException as e:
+            metrics.ERRORS.inc()
+            store.connection.record_failure(e)
+            return
+
+        if not response.ok:
+            metrics.ERRORS.inc()
+        if response.status_code >= 500:
+            store.connection.record_failure(f"HTTP {response.status_code}")
+            return
+        store.connection.record_success()
+        if not response.ok:
+            print(f"[{store.name}] API Error: HTTP {response.status_code}")
+            return
+
+        try:
+            data = store.api.decode(response)
+        except ValueError as e:
+            metrics.ERRORS.inc()
+            print(f"[{store.name}] Bad response: {e}")
+            return
+        orders = store.seen.filter(data.get("orders", []))
+        store.scheduler.record_poll(len(orders))
+        # Even when every order was a duplicate, so the same page isn't fetched again
+        store.last_id = max(store.last_id, data.get("last_id") or store.last_id)
+        store.checkpoint.save(store.last_id)
+        orders = [o for o in orders if not store.checkpoint.too_old(o)]  # Catch-up only
+        store.checkpoint.caught_up()
+        if orders:
+            for route in store.alerts:
+                future = loop.run_in_executor(self.alert_pool, route, store, orders)
+                future.add_done_callback(lambda f, route=route: self.alert_done(store, route, f))
+
+    def alert_done(self, store, route, future):
+        """Report an alert route that raised (its future is never awaited)"""
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[{store.name}] Alert {route.__name__} failed: {future.exception()!r}")
+
+
+def main(path=STORES_FILE):
+    stores = load_stores(path)
+    print(f"Polling {len(stores)} store(s) with up to {MAX_CONCURRENCY} requests in flight...")
+    metrics.start()
+    asyncio.run(MultiStorePoller(stores).run())
+
+
+if __name__ == "__main__":
+    try:
+        main(sys.argv[1] if len(sys.argv) > 1 else STORES_FILE)
+    except KeyboardInterrupt:
+        print("\nStopping order notifier...")
@@ -0,0 +1,374 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+import metrics
+import probe
+from alerts import LOW, URGENT, Alert, AlertQueue, call_with_timeout
+from checkpoint import CHECKPOINT_FILE, Checkpoint
+from connectivity import Connectivity
+from cycle import PollCycle
+from dedupe import SeenOrders
+from drivers import NOTIFY_DRIVERS, SOUND_DRIVERS, Notify, Sound, beep
+from hub import OrderHub
+from leader import LanLeader
+from order_log import OrderLog
+from order_store import DB_FILE, OrderStore
+from orders_api import OrdersClient
+from priority import PriorityAlerts
+from push import PushClient
+from scheduler import AdaptiveScheduler
+from stream_parse import OrderStreamParser
+from warm import ConnectionKeeper
+
+# The order notifier: one poller shared by every variant script.
+#
+# a.py, b.py, d.py, nf.py, final.py, end.py and end1.py only configure a
+# Notifier and call run(). Orders come from the push stream when the server
+# offers one and from adaptive polling otherwise; each new order is
+# checkpointed, de-duplicated, stored, turned into alerts by priority
+# (urgent ones at once, the rest coalesced, see priority.py) and handed to
+# the alert worker, which uses the sound / notification drivers picked once
+# at startup (see drivers.py). Polls run on fixed-rate deadlines with a time
+# budget per phase (see cycle.py), each on a connection warmed up just
+# before it (see warm.py). When a shop runs several terminals, only the one
+# elected on the LAN polls and it relays new orders to the others (see
+# leader.py). Optionally a local hub streams each new order to kitchen
+# displays and other clients (see hub.py).
+
+# =============== CONFIGURATION ===============
+API_URL = os.environ.get("NOTIFIER_API_URL", "https://midwaykebabish.ie/api/new-orders")
+CHECK_INTERVAL = 30     # Base interval in seconds (adapted by scheduler.py)
+APP_NAME = "Midway Kebabish Order Notifier"
+SOUND_TIMEOUT = 5       # Give up on a single play of the sound after this long
+INSTALL_PACKAGES = {"dbus": "python3-dbus", "paplay": "pulseaudio-utils"}
+LAN_ELECTION = bool(os.environ.get("NOTIFIER_LAN_KEY"))  # One terminal per shop polls (needs the key)
+HUB_PORT = None         # e.g. 8765 to stream orders to displays (None = no hub)
+SHUTDOWN_DRAIN = 30     # Seconds to keep alerting what is still queued on Ctrl+C
+# ============================================
+
+
+def hide_console():
+    """Hide the console window on Windows (no-op elsewhere or under pythonw)"""
+    if sys.platform != "win32" or sys.executable.endswith("pythonw.exe"):
+        return
+    import ctypes
+    ctypes.windll.user32.ShowWindow(ctypes.windll.kernel32.GetConsoleWindow(), 0)
+
+
+def install_missing(names):
+    """apt-get install whatever probe.py can't find (Linux, once per environment)"""
+    if sys.platform != "linux":
+        return
+    missing = [name for name in names
+               if not probe.has(name) and not probe.capabilities.flag(f"{name}_install_tried")]
+    for name in missing:
+        probe.capabilities.flag(f"{name}_install_tried", True)
+        package = INSTALL_PACKAGES.get(name, name)
+        print(f"Installing {package}...")
+        try:
+            subprocess.run(["sudo", "apt-get", "install", package, "-y"], check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Dependency installation failed: {e}")
+    if missing:
+        probe.capabilities.refresh()
+
+
+class Notifier:
+    """Watches the new-orders API and alerts staff"""
+
+    def __init__(self, api_url=API_URL, push=True, interval=CHECK_INTERVAL,
+                 title="New Orders Alert", app_name=APP_NAME, notify_timeout=10,
+                 sound_file=None, urgent_sound_file=None, sound_repeat=1, beeps=0, console=True,
+                 background=False, order_log=None, install=(), banner=(),
+                 checkpoint_file=CHECKPOINT_FILE, orders_db=DB_FILE,
+                 sound_drivers=SOUND_DRIVERS, notify_drivers=NOTIFY_DRIVERS,
+                 lan=LAN_ELECTION, hub_port=HUB_PORT):
+        self.console = console            # Print orders and errors
+        self.background = background      # Hide the console window on Windows
+        self.sound_repeat = sound_repeat  # Times the sound is played per alert
+        self.beeps = beeps                # Short beeps before the sound (and one low beep on errors)
+        self.install = install            # Linux capabilities to apt-get if missing
+        self.banner = banner              # Extra lines printed at startup
+        self.sound_file = sound_file
+
+        # Relative file names go in the app data directory, not the working directory
+        self.checkpoint = Checkpoint(probe.data_path(checkpoint_file))
+        self.last_id = self.checkpoint.load()
+        self.store = None                              # Order history, query with order_store.py
+        try:
+            self.store = OrderStore(probe.data_path(orders_db))
+        except (sqlite3.Error, OSError) as e:
+            self.log(f"Order history disabled ({e})")
+        self.seen = SeenOrders()                       # Ids already alerted, bounded in memory
+        self.order_log = None
+        if order_log:
+            try:
+                self.order_log = OrderLog(probe.data_path(order_log))
+            except OSError as e:
+                self.log(f"Order log disabled ({e})")
+        self.scheduler = AdaptiveScheduler(base_interval=interval)
+        self.cycle = PollCycle(self.scheduler, report=self.report, prepare=self.warm_up)
+        self.sound = Sound(sound_file, sound_drivers)
+        self.urgent_sound = Sound(urgent_sound_file, sound_drivers) if urgent_sound_file else None
+        self.notify = Notify(app_name, notify_timeout, notify_drivers)
+
+        self.alert_queue = AlertQueue(self.deliver_alert)
+        metrics.gauge("notifier_alert_queue_depth", "Alerts waiting to be delivered",
+                      self.alert_queue.depth)
+        self.coalescer = PriorityAlerts(self.alert_queue.submit, title=title)
+        self.connection = Connectivity(on_lost=self.connection_lost,
+                                       on_restored=self.connection_restored)
+        self.api = OrdersClient(api_url)
+        self.keeper = ConnectionKeeper(api_url)
+        self.push = PushClient(api_url + "/stream", self.handle_orders) if push else None
+        self.lan = LanLeader(api_url, self.handle_orders, lambda: self.last_id,
+                             report=self.report) if lan else None
+        self.hub = OrderHub(port=hub_port, report=self.report) if hub_port is not None else None
+
+        # Why polls are spaced as they are: a gauge, the reason in the summary
+        # line and full snapshots on 127.0.0.1:9464/status
+        metrics.gauge("notifier_poll_interval_seconds", "Interval chosen before the latest poll",
+                      lambda: round(self.scheduler.interval, 2))
+        metrics.detail("scheduler", self.scheduler.snapshot, lambda: self.scheduler.reason)
+        metrics.detail("cycle", self.cycle.snapshot)
+        metrics.detail("warm", self.keeper.snapshot)
+
+    # ---------- Output ----------
+
+    def log(self, message):
+        if self.console:
+            print(message)
+
+    def error(self, message):
+        """Count and report a failed poll; silent variants write it to the order log"""
+        metrics.ERRORS.inc()
+        if self.console:
+            print(message)
+        elif self.order_log:
+            self.order_log.write({"event": "error", "error": message})
+
+    def report(self, summary):
+        if self.console:
+            print(summary)
+        elif self.order_log:
+            self.order_log.write({"event": "metrics", "summary": summary})
+
+    # ---------- Alerts (run on the alert worker) ----------
+
+    def deliver_alert(self, alert):
+        """Show the notification and play the sound"""
+        try:
+            with metrics.timed(metrics.NOTIFY_TIME):  # A hung driver is demoted by the chain
+                self.notify.show(alert.title, alert.message,
+                                 alert.kind == "error" or alert.priority == URGENT)
+        except Exception as e:
+            self.log(f"Couldn't show notification: {e}")
+        if alert.kind == "info":
+            return
+        try:
+            with metrics.timed(metrics.SOUND_TIME):
+                call_with_timeout(self.play_alert_sound, alert,
+                                  timeout=SOUND_TIMEOUT * (self.sound_repeat + 1) + 1)
+        except Exception as e:
+            self.log(f"Couldn't play sound: {e}")
+
+    def play_alert_sound(self, alert):
+        if alert.kind == "error":
+            if self.beeps:
+                beep(800, 0.5)  # Single low beep for errors
+            return
+        if alert.priority == URGENT:
+            if self.urgent_sound:
+                self.urgent_sound.play(times=self.sound_repeat)
+                return
+            for _ in range(3):
+                beep(1500, 0.1)  # Three quick high beeps set urgent orders apart
+                time.sleep(0.05)
+        elif alert.priority == LOW:
+            self.sound.play(times=1)  # Batched updates: one play, no beeps
+            return
+        for _ in range(self.beeps):
+            beep(1000, 0.2)
+            time.sleep(0.1)
+        self.sound.play(times=self.sound_repeat)
+
+    def connection_lost(self, error):
+        """Called once when polls start failing"""
+        self.log(f"⚠️ No internet connection ({error}) - pausing polls until it is back")
+        self.alert_queue.submit(Alert("Connection Lost", "No internet connection detected", kind="error"))
+
+    def connection_restored(self):
+        """Called once when a poll succeeds again"""
+        self.log("✅ Connection restored")
+        self.alert_queue.submit(Alert("Connection Restored", "Internet connection is back online", kind="info"))
+
+    # ---------- Orders ----------
+
+    def handle_order(self, order):
+        """Alert on one new order as soon as it has been parsed"""
+        self.last_id = max(self.last_id, order.id)  # Checkpoint as each order is handled
+        if self.seen.check(order.id):
+            self.log(f"Skipping duplicate order {order.id}")
+            return
+        if self.checkpoint.too_old(order):
+            self.log(f"Skipping order {order.id}: older than the catch-up age")
+            if self.order_log:
+                self.order_log.log_order(order, alerted=False)
+            return
+
+        self.coalescer.add([order])  # Urgent: alerted alone at once; others: per burst
+        if self.hub:
+            self.hub.publish([order])
+        if self.order_log:
+            self.order_log.log_order(order)
+        self.log(f"\n🔔 New order received!\nOrder ID: {order.id}\n"
+                 f"Customer: {order.customer or 'N/A'}\nStatus: {order.status or 'N/A'}\n"
+                 f"Amount: {order.amount_text()}")
+
+    def handle_orders(self, orders, last_id):
+        """Alert on a batch of new orders from the push stream or the LAN leader (may be empty)"""
+        for order in orders:
+            self.handle_order(order)
+        if self.store:
+            self.store.add_many(orders)
+        self.last_id = max(self.last_id, last_id)
+        self.checkpoint.save(self.last_id)
+        self.checkpoint.caught_up()
+        if self.lan:
+            self.lan.relay(orders, self.last_id)
+
+    def check_orders(self):
+        """Poll once; True if the API answered"""
+        if not self.connection.allow_request():
+            return False  # Offline: wait for the next half-open probe
+        with self.cycle.phase("connect") as connect:
+            if connect.budget is None:
+                self.log("Skipping poll: no time left in this cycle")
+                return False
+            timeout = (min(self.api.retry.timeout[0], connect.budget), connect.budget)
+            try:
+                response = self.api.get_new_orders(self.last_id, timeout=timeout, stream=True,
+                                                   deadline=connect.budget)
+            except requests.exceptions.RequestException as e:
+                self.connection.record_failure(e)
+                self.error(f"Connection Error: {e}")
+                return False
+
+        # Any answer from the API means we are online; 5xx counts as an outage
+        if response.status_code >= 500:
+            self.connection.record_failure(f"HTTP {response.status_code}")
+        else:
+            self.connection.record_success()
+        if not response.ok:  # 200, or 304 / 204 for "nothing new", is ok
+            response.close()
+            self.error(f"API Error: HTTP {response.status_code}")
+            return False
+
+        # Orders are handled one by one while the body is still arriving
+        parser = OrderStreamParser()
+        received = []
+        complete = None  # Stays None if the read fails
+        try:
+            with self.cycle.phase("read") as read:
+                for order in self.api.iter_orders(response, parser):
+                    self.handle_order(order)
+                    received.append(order)
+                    if read.over():
+                        # last_id only covers handled orders: the rest come next poll
+                        response.close()
+                        complete = False
+                        break
+                else:
+                    complete = True
+        except requests.exceptions.RequestException as e:
+            self.connection.record_failure(e)
+            self.error(f"Connection Error: {e}")
+            return False
+        except ValueError as e:
+            self.error(f"API Error: bad response ({e})")
+            return False
+        finally:
+            with self.cycle.phase("dispatch"):
+                if self.store:
+                    self.store.add_many(received)  # One transaction per poll
+                if complete is not None:
+                    self.scheduler.record_poll(len(received))
+                if complete:
+                    self.checkpoint.caught_up()  # Later orders are live: always alerted
+                if received:
+                    if complete:
+                        self.last_id = max(self.last_id, parser.fields.get("last_id", self.last_id))
+                    self.checkpoint.save(self.last_id)
+                    if self.lan:
+                        self.lan.relay(received, self.last_id)
+        return True
+
+    # ---------- Main loop ----------
+
+    def init_backends(self):
+        """Set up everything optional; runs in the background after the first poll"""
+        install_missing(self.install)
+        self.log(f"Sound: {self.sound.current}, notifications: {self.notify.current}")
+
+    def warm_up(self):
+        """Runs just before each poll: have a resolved, open connection ready"""
+        if self.connection.online and (not self.lan or self.lan.polling):
+            self.keeper.warm()
+
+    def step(self):
+        """One round: hold the push stream while it works, then poll"""
+        if self.lan and not self.lan.polling:
+            return  # Another terminal polls; its orders arrive through self.lan
+        try:
+            if self.push and self.connection.online and self.push.available():
+                self.push.run(lambda: self.last_id)  # Blocks while the stream is healthy
+                self.cycle.begin()  # Polling resumes: a fresh cycle, not an overrun
+            self.check_orders()
+        except Exception as e:
+            self.error(f"Unexpected error: {e!r}")
+
+    def run(self):
+        if self.background:
+            hide_console()
+        self.log("Midway Kebabish Order Notifier")
+        self.log(f"Checking for new orders every {self.scheduler.min_interval}-"
+                 f"{self.cycle.max_interval} seconds (adaptive, SLA {self.cycle.sla}s)...")
+        if self.sound_file:
+            self.log(f"Sound file location: {self.sound_file}")
+        for line in self.banner:
+            self.log(line)
+        self.log("")
+
+        # Drivers get resolved in the background: the first poll goes out now
+        threading.Thread(target=self.init_backends, daemon=True).start()
+        if self.lan:
+            self.lan.start()
+        if self.hub:
+            self.hub.start()
+
+        # Prometheus text on 127.0.0.1:9464/metrics plus a summary line every 5 minutes;
+        # started first, as the first step may stay on the push stream
+        metrics.start(report=self.report)
+
+        try:
+            self.cycle.begin()
+            self.step()
+            while True:
+                self.cycle.wait()
+                self.step()
+        except KeyboardInterrupt:
+            self.log("\nStopping order notifier...")
+            # Orders still in a coalescing window are already checkpointed:
+            # alert them now or they are never alerted at all
+            self.coalescer.flush()
+            if self.alert_queue.depth():
+                self.log(f"Delivering {self.alert_queue.depth()} queued alert(s)...")
+            self.alert_queue.stop(timeout=SHUTDOWN_DRAIN)
+            self.log(f"Duplicate orders suppressed: {self.seen.stats['duplicates']}")
+            self.log(f"Warm connection reuse: {self.keeper.reuse_ratio():.0%}")
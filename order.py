@@ -0,0 +1,155 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Typed, compact representation of one order from /api/new-orders.
+#
+# Order.from_json() is the only place that knows the shape of the API
+# payload; everything else uses the attributes. Amounts are kept as integer
+# cents, unknown or malformed fields are tolerated rather than raising. Only
+# a record without a usable id can't be decoded: decode_orders() skips and
+# reports it, so one bad record doesn't hold back the orders after it.
+
+CURRENCY = "€"
+KNOWN_FIELDS = frozenset([
+    "id", "user_name", "order_status", "total_amount", "created_at",
+    "order_type", "delivery_type", "items",
+])
+
+
+def parse_cents(value):
+    """'12.50' / 12.5 / '€12,50' -> 1250; None if it isn't a number"""
+    if value is None or value == "":
+        return None
+    text = str(value).strip().lstrip(CURRENCY).replace(",", ".")
+    try:
+        return int((Decimal(text) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def format_cents(cents):
+    """1250 -> '€12.50'"""
+    sign = "-" if cents < 0 else ""
+    euros, cents = divmod(abs(cents), 100)
+    return f"{sign}{CURRENCY}{euros}.{cents:02d}"
+
+
+def parse_time(value):
+    """ISO-8601 (with or without 'Z') -> datetime; None if unparseable"""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def parse_items(value):
+    """Items as a tuple of (name, quantity), whatever shape they arrive in"""
+    items = []
+    for item in value or ():
+        if isinstance(item, dict):
+            name = item.get("name") or item.get("item_name") or item.get("title")
+            qty = item.get("quantity") or item.get("qty") or 1
+            if name:
+                items.append((str(name), int(qty) if str(qty).isdigit() else 1))
+        elif item:
+            items.append((str(item), 1))
+    return tuple(items)
+
+
+class Order:
+    """One order; decode API payloads with Order.from_json()"""
+
+    __slots__ = ("id", "customer", "status", "amount_cents", "created_at",
+                 "order_type", "items", "extra")
+
+    def __init__(self, id, customer=None, status=None, amount_cents=None,
+                 created_at=None, order_type=None, items=(), extra=None):
+        self.id = id
+        self.customer = customer
+        self.status = status
+        self.amount_cents = amount_cents
+        self.created_at = created_at
+        self.order_type = order_type
+        self.items = items
+        self.extra = extra  # Unknown fields, kept only if present
+
+    @classmethod
+    def from_json(cls, data):
+        """Decode one API record; ValueError if it has no usable id"""
+        try:
+            order_id = int(data["id"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"no usable order id ({e!r})") from None
+        user = data.get("user_name")
+        if isinstance(user, dict):
+            user = user.get("name")
+        extra = {k: v for k, v in data.items() if k not in KNOWN_FIELDS}
+        return cls(
+            order_id,
+            customer=user or None,
+            status=data.get("order_status"),
+            amount_cents=parse_cents(data.get("total_amount")),
+            created_at=parse_time(data.get("created_at")),
+            order_type=data.get("order_type") or data.get("delivery_type"),
+            items=parse_items(data.get("items")),
+            extra=extra or None,
+        )
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict(), e.g. for orders relayed between terminals"""
+        return cls(
+            int(data["id"]),
+            customer=data.get("customer"),
+            status=data.get("status"),
+            amount_cents=data.get("amount_cents"),
+            created_at=parse_time(data.get("created_at")),
+            order_type=data.get("order_type"),
+            items=tuple((str(name), int(qty)) for name, qty in data.get("items") or ()),
+            extra=data.get("extra") or None,
+        )
+
+    @property
+    def amount(self):
+        if self.amount_cents is None:
+            return None
+        return Decimal(self.amount_cents) / 100
+
+    def amount_text(self, default="N/A"):
+        if self.amount_cents is None:
+            return default
+        return format_cents(self.amount_cents)
+
+    def to_dict(self):
+        """Plain dict for logs and JSON output (extra only if present)"""
+        data = {
+            "id": self.id,
+            "customer": self.customer,
+            "status": self.status,
+            "amount_cents": self.amount_cents,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "order_type": self.order_type,
+            "items": [list(item) for item in self.items],
+        }
+        if self.extra:
+            data["extra"] = self.extra  # e.g. scheduled_at, which priority.py scores on
+        return data
+
+    def __repr__(self):
+        return f"Order(id={self.id}, status={self.status!r}, amount={self.amount_text()})"
+
+
+def decode_order(record):
+    """Order.from_json(), or None (reported) for a record that can't be decoded"""
+    try:
+        return Order.from_json(record)
+    except ValueError as e:
+        print(f"Skipping undecodable order {str(record)[:80]}: {e}")
+        return None
+
+
+def decode_orders(records):
+    """Orders from a list of API records, skipping the ones that can't be decoded"""
+    return [order for order in map(decode_order, records or ()) if order is not None]
@@ -0,0 +1,156 @@
+import atexit
+import glob
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+# Buffered, rotating JSON-lines order log.
+#
+# One file handle stays open; records are buffered in memory and written
+# every FLUSH_INTERVAL seconds (or once BUFFER_LINES are waiting), with an
+# fsync at most every FSYNC_INTERVAL seconds. The file is rotated when it
+# grows past MAX_BYTES or the date changes; rotated files are gzipped and
+# only the newest BACKUPS are kept. Everything is flushed at exit.
+
+# =============== CONFIGURATION ===============
+LOG_FILE = "order_log.jsonl"
+MAX_BYTES = 5 * 1024 * 1024   # Rotate when the file grows past this (0 = never)
+ROTATE_DAILY = True           # Also rotate when the date changes
+BACKUPS = 10                  # Rotated files to keep
+COMPRESS = True               # gzip rotated files
+BUFFER_LINES = 50             # Write out once this many records are waiting
+FLUSH_INTERVAL = 2.0          # Seconds between background flushes
+FSYNC_INTERVAL = 30.0         # Seconds between fsyncs
+# ============================================
+
+
+def detection_latency(order, now=None):
+    """Seconds between the order being created and us seeing it"""
+    if order.created_at is None:
+        return None
+    created = order.created_at
+    if created.tzinfo is None:
+        created = created.astimezone()  # Naive timestamps are local time
+    now = now or datetime.now(timezone.utc)
+    return round((now - created).total_seconds(), 3)
+
+
+class OrderLog:
+    """Append-only structured log with batching and rotation"""
+
+    def __init__(self, path=LOG_FILE, max_bytes=MAX_BYTES, rotate_daily=ROTATE_DAILY,
+                 backups=BACKUPS, compress=COMPRESS, flush_interval=FLUSH_INTERVAL,
+                 fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.backups = backups
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._day = None
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._open()
+        self._flusher = threading.Thread(target=self._flush_loop, name="order-log", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def write(self, record):
+        """Queue one record (a dict) for the log"""
+        line = json.dumps(record, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= BUFFER_LINES:
+                self._flush_locked()
+
+    def log_order(self, order, **fields):
+        """Queue the standard record for a detected order"""
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "event": "order",
+            "id": order.id,
+            "status": order.status,
+            "amount_cents": order.amount_cents,
+            "latency_s": detection_latency(order),
+        }
+        record.update(fields)
+        self.write(record)
+
+    def flush(self, fsync=False):
+        with self._lock:
+            self._flush_locked(fsync)
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush_locked(fsync=True)
+            self._file.close()
+
+    def _open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._day = datetime.now().date()
+
+    def _flush_loop(self):
+        while not self._closed:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                if self._closed:
+                    return
+                due = time.monotonic() - self._last_fsync >= self.fsync_interval
+                self._flush_locked(fsync=due)
+
+    def _flush_locked(self, fsync=False):
+        if self._closed and self._file.closed:
+            return
+        if self._buffer:
+            if self._needs_rotation():
+                self._rotate()
+            data = "".join(self._buffer)
+            self._buffer = []
+            self._file.write(data)
+            self._size += len(data.encode("utf-8"))
+            self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+
+    def _needs_rotation(self):
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        return self.rotate_daily and datetime.now().date() != self._day
+
+    def _rotate(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        rotated = f"{self.path}.{stamp}"
+        n = 0
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            n += 1
+            rotated = f"{self.path}.{stamp}-{n}"
+        os.replace(self.path, rotated)
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+        old = sorted(glob.glob(glob.escape(self.path) + ".*"))
+        for path in old[:-self.backups] if self.backups else old:
+            os.remove(path)
+        self._open()
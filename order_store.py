@@ -0,0 +1,186 @@
+import argparse
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import probe
+from order import format_cents
+
+# Local SQLite store of every order the notifier has seen, so staff can
+# answer "what came in between 7 and 8pm" without calling the remote API.
+#
+#   python order_store.py recent -n 20
+#   python order_store.py count --since 19:00 --until 20:00
+#   python order_store.py revenue --since 2025-04-15 --by hour
+#
+# The database runs in WAL mode so the CLI can read while the notifier
+# writes; each poll's orders are inserted in a single transaction.
+
+# =============== CONFIGURATION ===============
+DB_FILE = "orders.db"   # In probe.DATA_DIR, where the notifier writes it
+# ============================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id           INTEGER PRIMARY KEY,
+    created_at   TEXT,            -- UTC, 'YYYY-MM-DD HH:MM:SS'
+    detected_at  TEXT NOT NULL,   -- UTC, when this notifier first saw it
+    status       TEXT,
+    amount_cents INTEGER,
+    customer     TEXT,
+    order_type   TEXT,
+    items        TEXT             -- JSON list of [name, quantity]
+);
+CREATE INDEX IF NOT EXISTS idx_orders_created ON orders (created_at);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, created_at);
+"""
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def to_utc_text(dt):
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.astimezone()
+    return dt.astimezone(timezone.utc).strftime(TIME_FORMAT)
+
+
+class OrderStore:
+    """Embedded order history"""
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def add_many(self, orders):
+        """Insert (or update the status of) a batch of orders in one transaction"""
+        if not orders:
+            return
+        now = to_utc_text(datetime.now(timezone.utc))
+        rows = [
+            (o.id, to_utc_text(o.created_at), now, o.status, o.amount_cents,
+             o.customer, o.order_type, json.dumps(o.items) if o.items else None)
+            for o in orders
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT INTO orders (id, created_at, detected_at, status, amount_cents,"
+                    " customer, order_type, items) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET status = excluded.status",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def recent(self, limit=20):
+        return self._query(
+            "SELECT id, created_at, status, amount_cents, customer FROM orders"
+            " ORDER BY id DESC LIMIT ?", (limit,))
+
+    def count(self, since, until, status=None):
+        sql = "SELECT COUNT(*) FROM orders WHERE created_at >= ? AND created_at < ?"
+        args = [to_utc_text(since), to_utc_text(until)]
+        if status:
+            sql += " AND status = ?"
+            args.append(status)
+        return self._query(sql, args)[0][0]
+
+    def revenue(self, since, until, by=None):
+        """Total amount in cents, optionally grouped by 'hour', 'day' or 'status'"""
+        args = (to_utc_text(since), to_utc_text(until))
+        where = "WHERE created_at >= ? AND created_at < ?"
+        if by is None:
+            return self._query(
+                f"SELECT COUNT(*), COALESCE(SUM(amount_cents), 0) FROM orders {where}", args)
+        group = {
+            "hour": "strftime('%Y-%m-%d %H:00', created_at, 'localtime')",
+            "day": "date(created_at, 'localtime')",
+            "status": "status",
+        }[by]
+        return self._query(
+            f"SELECT {group} AS bucket, COUNT(*), COALESCE(SUM(amount_cents), 0)"
+            f" FROM orders {where} GROUP BY bucket ORDER BY bucket", args)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+
+def parse_when(text, default):
+    """'19:00' (today), '2025-04-15' or '2025-04-15 19:00' in local time"""
+    if not text:
+        return default
+    for fmt in ("%H:%M", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y-%m-%dT%H:%M"):
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        if fmt == "%H:%M":
+            parsed = datetime.combine(datetime.now().date(), parsed.time())
+        return parsed.astimezone()
+    raise argparse.ArgumentTypeError(f"Can't understand time {text!r}")
+
+
+def local_text(utc_text):
+    if not utc_text:
+        return "N/A"
+    dt = datetime.strptime(utc_text, TIME_FORMAT).replace(tzinfo=timezone.utc)
+    return dt.astimezone().strftime("%Y-%m-%d %H:%M")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up orders seen by the notifier")
+    parser.add_argument("--db", default=probe.data_path(DB_FILE))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    recent = sub.add_parser("recent", help="Latest orders")
+    recent.add_argument("-n", type=int, default=20)
+
+    for name in ("count", "revenue"):
+        p = sub.add_parser(name, help=f"Order {name} in a time window (default: today)")
+        p.add_argument("--since", help="e.g. 19:00, 2025-04-15 or '2025-04-15 19:00'")
+        p.add_argument("--until")
+        if name == "count":
+            p.add_argument("--status")
+        else:
+            p.add_argument("--by", choices=["hour", "day", "status"])
+
+    args = parser.parse_args(argv)
+    store = OrderStore(args.db)
+
+    if args.command == "recent":
+        for order_id, created, status, cents, customer in store.recent(args.n):
+            amount = format_cents(cents) if cents is not None else "N/A"
+            print(f"#{order_id:<8} {local_text(created)}  {status or 'N/A':<12} {amount:>9}  {customer or ''}")
+        return
+
+    midnight = datetime.combine(datetime.now().date(), datetime.min.time()).astimezone()
+    since = parse_when(args.since, midnight)
+    until = parse_when(args.until, since + timedelta(days=1) if args.since else midnight + timedelta(days=1))
+
+    if args.command == "count":
+        print(store.count(since, until, args.status))
+    elif args.by:
+        for bucket, count, cents in store.revenue(since, until, args.by):
+            print(f"{bucket or 'N/A':<17} {count:>5} orders  {format_cents(cents):>10}")
+    else:
+        count, cents = store.revenue(since, until)[0]
+        print(f"{count} orders, {format_cents(cents)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import time
+
+from urllib3.util import make_headers
+
+import metrics
+from http_session import get_session
+from order import decode_order, decode_orders
+from retry import RetryPolicy
+from stream_parse import OrderStreamParser, iter_orders
+
+# Client for the /api/new-orders endpoint.
+#
+# Most polls find nothing new, so each request is made conditional on the
+# ETag / Last-Modified the server returned for the same last_id. A 304 or
+# 204 answer is treated as "no new orders" without downloading or parsing a
+# body. Non-empty answers are negotiated as gzip (and brotli when the brotli
+# package is installed) and the bytes saved are counted in `stats` and
+# exported as metrics.
+#
+# With stream=True the body is not read up front; iter_orders() then parses
+# the orders array one order at a time as it comes off the wire.
+#
+# Every poll goes through a RetryPolicy (retry.py): separate connect / read
+# timeouts, jittered and budgeted retries, and hedging of slow requests.
+
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+EMPTY = {"orders": [], "count": 0}
+STREAM_CHUNK = 16384
+
+NOT_MODIFIED = metrics.counter("notifier_not_modified_total", "Polls answered 304 / 204 without a body")
+BYTES_WIRE = metrics.counter("notifier_response_bytes_wire_total", "Response body bytes received")
+BYTES_DECODED = metrics.counter("notifier_response_bytes_decoded_total",
+                                "Response body bytes after decompression")
+BYTES_SAVED = metrics.counter("notifier_response_bytes_saved_total",
+                              "Bytes not transferred thanks to compression and skipped bodies")
+
+
+class OrdersClient:
+    """Conditional, compressed GETs against the new-orders endpoint"""
+
+    def __init__(self, url, retry=None, session=None):
+        self.url = url
+        self.retry = retry or RetryPolicy()
+        self.session = session  # None: the process-wide shared session
+        self.validator = None  # (last_id, etag, last_modified, body_size)
+        self.stats = {
+            "requests": 0,
+            "not_modified": 0,      # 304 / 204 answers
+            "bytes_wire": 0,        # Body bytes actually received
+            "bytes_decoded": 0,     # Body bytes after decompression
+            "bytes_saved": 0,       # Compression savings + skipped bodies
+        }
+
+    def get_new_orders(self, last_id, timeout=None, stream=False, deadline=None):
+        """GET orders newer than last_id and return the response.
+
+        timeout defaults to the retry policy's (connect, read) timeouts;
+        deadline caps the seconds spent on retries (see retry.py).
+        """
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if self.validator and self.validator[0] == last_id:
+            _, etag, last_modified, _ = self.validator
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        def request(timeout):
+            return (self.session or get_session()).get(
+                self.url,
+                params={"last_id": last_id},
+                headers=headers,
+                timeout=timeout,
+                stream=stream,
+            )
+
+        metrics.POLLS.inc()
+        with metrics.timed(metrics.POLL_RTT):
+            response = self.retry.call(request, timeout, deadline)
+        self._record(response, last_id, stream)
+        return response
+
+    def decode(self, response):
+        """Return the payload with orders decoded, or an empty result for 304 / 204"""
+        if response.status_code in (204, 304):
+            metrics.EMPTY_POLLS.inc()
+            return dict(EMPTY, orders=[])
+        with metrics.timed(metrics.DECODE_TIME):
+            data = response.json()
+            if not isinstance(data, dict):
+                raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+            data["orders"] = decode_orders(data.get("orders"))
+        self._count_orders(len(data["orders"]))
+        return data
+
+    def iter_orders(self, response, parser=None):
+        """Yield Orders from a stream=True response as each one is parsed.
+
+        Top-level fields such as last_id end up in parser.fields.
+        """
+        if response.status_code in (204, 304):
+            metrics.EMPTY_POLLS.inc()
+            response.content  # Reading the empty body hands the connection back to the pool
+            return
+        decoded = [0]
+        waiting = [0.0]  # Time spent waiting on the network, not decoding
+
+        def chunks():
+            body = response.iter_content(chunk_size=STREAM_CHUNK)
+            while True:
+                started = time.perf_counter()
+                chunk = next(body, None)
+                waiting[0] += time.perf_counter() - started
+                if chunk is None:
+                    return
+                decoded[0] += len(chunk)
+                yield chunk
+
+        orders = iter_orders(chunks(), parser or OrderStreamParser())
+        busy, count = 0.0, 0
+        try:
+            while True:
+                started = time.perf_counter()
+                data = next(orders, None)
+                order = decode_order(data) if data is not None else None
+                busy += time.perf_counter() - started
+                if data is None:
+                    break
+                if order is None:
+                    continue  # Reported and skipped: the orders after it still come through
+                count += 1
+                yield order
+        finally:
+            metrics.DECODE_TIME.observe(max(busy - waiting[0], 0.0))
+            self._count_orders(count)
+            self._count_bytes(response, decoded[0])
+            response.close()
+
+    def _record(self, response, last_id, stream=False):
+        stats = self.stats
+        stats["requests"] += 1
+
+        if response.status_code in (204, 304):
+            stats["not_modified"] += 1
+            NOT_MODIFIED.inc()
+            if self.validator and self.validator[0] == last_id:
+                stats["bytes_saved"] += self.validator[3]
+                BYTES_SAVED.inc(self.validator[3])
+            return
+
+        wire = 0
+        if not stream:
+            wire = self._count_bytes(response, len(response.content))
+
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            self.validator = (last_id, etag, last_modified, wire)
+        else:
+            self.validator = None
+
+    def _count_orders(self, count):
+        if count:
+            metrics.ORDERS.inc(count)
+        else:
+            metrics.EMPTY_POLLS.inc()
+
+    def _count_bytes(self, response, decoded):
+        wire = response.raw.tell() if response.raw is not None else decoded
+        wire = wire or decoded
+        saved = max(decoded - wire, 0)
+        self.stats["bytes_wire"] += wire
+        self.stats["bytes_decoded"] += decoded
+        self.stats["bytes_saved"] += saved
+        BYTES_WIRE.inc(wire)
+        BYTES_DECODED.inc(decoded)
+        BYTES_SAVED.inc(saved)
+        if self.validator and self.validator[3] == 0:
+            self.validator = self.validator[:3] + (wire,)
+        return wire
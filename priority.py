@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+
+import metrics
+from alerts import LOW, NORMAL, URGENT, Alert
+from coalesce import Coalescer
+from order import parse_time
+
+# Priority-aware alerting.
+#
+# Every order is scored on fields the API already sends:
+#   total_amount     HIGH_VALUE or more: +3, half of it: +1
+#   order_status     URGENT_STATUSES: +3; LOW_STATUSES (an update to an order
+#                    staff already know about) make it LOW outright
+#   scheduled time   due within DUE_SOON minutes: +3 (DELIVERY_LEAD more for
+#                    deliveries, the driver needs time); more than LATER
+#                    minutes away: -3
+# 3 or more is URGENT, below 0 is LOW, anything else NORMAL.
+#
+# URGENT orders get an alert of their own straight away: never coalesced,
+# ahead of everything waiting in the alert queue, with the urgent sound.
+# NORMAL orders are coalesced into burst summaries as before (coalesce.py).
+# LOW orders are batched into one summary per LOW_WINDOW.
+
+# =============== CONFIGURATION ===============
+HIGH_VALUE = 6000         # Cents; orders from €60 are urgent
+DUE_SOON = 20             # Minutes; collection due sooner than this is urgent
+DELIVERY_LEAD = 15        # Extra minutes for deliveries
+LATER = 90                # Minutes; scheduled further out than this is low priority
+URGENT_STATUSES = ("urgent", "asap", "priority")
+LOW_STATUSES = ("updated", "cancelled", "canceled", "refunded", "completed", "delivered", "ready")
+SCHEDULE_FIELDS = ("scheduled_at", "scheduled_time", "pickup_time", "delivery_time")
+LOW_WINDOW = 60           # Seconds low-priority orders are gathered for
+LOW_PER_MINUTE = 1
+# ============================================
+
+URGENT_POINTS = 3
+URGENT_ALERTS = metrics.counter("notifier_urgent_alerts_total", "Orders alerted as urgent")
+LOW_ORDERS = metrics.counter("notifier_low_priority_orders_total", "Orders batched as low priority")
+
+
+def scheduled_time(order):
+    """When the order is due, if the payload says (aware datetime)"""
+    for field in SCHEDULE_FIELDS:
+        due = parse_time((order.extra or {}).get(field))
+        if due is not None:
+            return due if due.tzinfo else due.astimezone()  # Naive timestamps are local time
+    return None
+
+
+def classify(order, now=None):
+    """(priority, reasons) for one order"""
+    status = (order.status or "").lower()
+    if status in LOW_STATUSES:
+        return LOW, [f"status {status}"]
+
+    points, reasons = 0, []
+    if status in URGENT_STATUSES:
+        points += 3
+        reasons.append(status)
+    if order.amount_cents is not None:
+        if order.amount_cents >= HIGH_VALUE:
+            points += 3
+            reasons.append(f"{order.amount_text()} order")
+        elif order.amount_cents >= HIGH_VALUE // 2:
+            points += 1
+    due = scheduled_time(order)
+    if due is not None:
+        minutes = (due - (now or datetime.now(timezone.utc))) / timedelta(minutes=1)
+        soon = DUE_SOON + (DELIVERY_LEAD if (order.order_type or "").lower() == "delivery" else 0)
+        if minutes <= soon:
+            points += 3
+            reasons.append(f"due in {max(int(minutes), 0)} min")
+        elif minutes >= LATER:
+            points -= 3
+            reasons.append(f"scheduled for {due.astimezone():%H:%M}")
+
+    if points >= URGENT_POINTS:
+        return URGENT, reasons
+    return (LOW if points < 0 else NORMAL), reasons
+
+
+class PriorityAlerts:
+    """Turns new orders into alerts: urgent ones alone and at once, the rest coalesced"""
+
+    def __init__(self, emit, title="New Orders Alert"):
+        self.emit = emit  # Called as emit(alert), e.g. AlertQueue.submit
+        self.title = title
+        self.normal = Coalescer(emit, title=title)
+        self.low = Coalescer(emit, title="Order Updates", window=LOW_WINDOW,
+                             max_per_minute=LOW_PER_MINUTE, priority=LOW, immediate=False,
+                             heading="order update(s) or orders for later")
+        self.stats = {"urgent": 0, "normal": 0, "low": 0}
+
+    def add(self, orders):
+        """Hand over newly detected orders"""
+        now = datetime.now(timezone.utc)
+        normal, low = [], []
+        for order in orders:
+            level, reasons = classify(order, now)
+            if level == URGENT:
+                self.stats["urgent"] += 1
+                URGENT_ALERTS.inc()
+                self.emit(Alert(f"⚡ Urgent order #{order.id}",
+                                f"{', '.join(reasons)} · {order.customer or 'N/A'} · {order.amount_text()}",
+                                [order], priority=URGENT))
+            elif level == LOW:
+                low.append(order)
+            else:
+                normal.append(order)
+        self.stats["normal"] += len(normal)
+        self.stats["low"] += len(low)
+        LOW_ORDERS.inc(len(low))
+        self.normal.add(normal)
+        self.low.add(low)
+
+    def flush(self):
+        """Emit whatever is waiting now (e.g. on shutdown)"""
+        self.normal.flush()
+        self.low.flush()
@@ -0,0 +1,168 @@
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import sys
+import sysconfig
+import tempfile
+import threading
+import time
+
+# Cached capability probing.
+#
+# What the notifier can use (dbus, plyer, simpleaudio, paplay / pacat / aplay,
+# ffmpeg ...) is worked out once and saved to PROBE_FILE together with a
+# fingerprint of the environment: OS, Python executable, PATH, the desktop
+# session variables and the modification times of site-packages. If any of
+# those change (a package is installed, PATH is edited, a different user
+# session) or the cache is older than MAX_AGE, everything is probed again.
+#
+# Modules are checked with importlib.util.find_spec, so nothing is actually
+# imported, and programs with shutil.which, so nothing is run.
+#
+# DATA_DIR is where the notifier keeps its own files (checkpoint, order
+# database, order log), so they don't depend on the working directory it
+# was started from.
+
+# =============== CONFIGURATION ===============
+if platform.system() == "Windows":
+    CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA", tempfile.gettempdir()), "OrderNotifier")
+else:
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "order-notifier")
+PROBE_FILE = os.path.join(CACHE_DIR, "capabilities.json")
+if platform.system() == "Windows":
+    DATA_DIR = CACHE_DIR
+else:
+    DATA_DIR = os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"),
+                            "order-notifier")
+DATA_DIR = os.environ.get("NOTIFIER_DATA_DIR") or DATA_DIR
+MAX_AGE = 7 * 24 * 3600   # Re-probe at least weekly
+# ============================================
+
+MODULES = ["dbus", "plyer", "simpleaudio", "winsound", "psutil"]
+PROGRAMS = ["paplay", "pacat", "aplay", "ffmpeg", "ffplay", "afplay", "notify-send"]
+SESSION_VARS = ["DISPLAY", "WAYLAND_DISPLAY", "DBUS_SESSION_BUS_ADDRESS", "PULSE_SERVER"]
+
+
+def fingerprint():
+    """Hash of everything that can change what is installed or reachable"""
+    parts = [platform.system(), platform.release(), sys.executable, sys.version,
+             os.environ.get("PATH", "")]
+    parts += [f"{name}={os.environ.get(name, '')}" for name in SESSION_VARS]
+    for key in ("purelib", "platlib"):
+        path = sysconfig.get_paths().get(key)
+        try:
+            parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except (OSError, TypeError):
+            parts.append(f"{path}:missing")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def data_path(name):
+    """Absolute path for a notifier data file (relative names go in DATA_DIR)"""
+    if os.path.isabs(name):
+        return name
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+    except OSError:
+        pass  # Opening the file will report it
+    return os.path.join(DATA_DIR, name)
+
+
+def _probe_all():
+    results = {}
+    for name in MODULES:
+        try:
+            results[name] = importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):
+            results[name] = False
+    for name in PROGRAMS:
+        results[name] = shutil.which(name) is not None
+    return results
+
+
+class Capabilities:
+    """Probe results, loaded from the cache when the environment is unchanged"""
+
+    def __init__(self, path=PROBE_FILE, max_age=MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.results = None
+        self.flags = {}        # Notes that survive restarts, e.g. "install tried"
+        self.from_cache = False
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """True if the module / program `name` is available"""
+        self._ensure()
+        if name not in self.results:
+            # Not a standard probe: check it now and remember it
+            with self._lock:
+                found = shutil.which(name) is not None
+                if not found:
+                    try:
+                        found = importlib.util.find_spec(name) is not None
+                    except (ImportError, ValueError):
+                        found = False
+                self.results[name] = found
+                self._save()
+        return self.results[name]
+
+    def flag(self, name, value=None):
+        """Read (value=None) or set a persistent flag"""
+        self._ensure()
+        if value is None:
+            return self.flags.get(name)
+        with self._lock:
+            self.flags[name] = value
+            self._save()
+        return value
+
+    def refresh(self):
+        """Probe again now, e.g. after installing something"""
+        with self._lock:
+            self.results = _probe_all()
+            self.from_cache = False
+            self._save()
+        return self.results
+
+    def _ensure(self):
+        if self.results is not None:
+            return
+        with self._lock:
+            if self.results is not None:
+                return
+            current = fingerprint()
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    cached = json.load(f)
+                if cached["fingerprint"] == current and time.time() - cached["time"] < self.max_age:
+                    self.results = cached["results"]
+                    self.flags = cached.get("flags", {})
+                    self.from_cache = True
+                    return
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+            self.results = _probe_all()  # Flags belong to the old environment: dropped
+            self._save(current)
+
+    def _save(self, current=None):
+        data = {"fingerprint": current or fingerprint(), "time": time.time(),
+                "results": self.results, "flags": self.flags}
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # Not being able to cache only costs a re-probe next start
+
+
+capabilities = Capabilities()
+
+
+def has(name):
+    return capabilities.get(name)
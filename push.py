@@ -0,0 +1,142 @@
+import codecs
+import json
+import time
+
+import requests
+
+from http_session import get_session
+from order import decode_orders
+
+# Push delivery of new orders. Holds a Server-Sent Events stream (or a
+# long-poll request, if that is what the server answers with) open against
+# the new-orders endpoint so orders are handed over the moment they exist.
+# Whenever the stream is unavailable the caller falls back to normal polling
+# until RETRY_AFTER has passed.
+
+# =============== CONFIGURATION ===============
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 45          # Server must send data or a heartbeat within this
+LONG_POLL_WAIT = 25        # Seconds we ask a long-poll server to hold the request
+MIN_LONG_POLL = 1.0        # Empty answers faster than this mean "no long-poll"
+RETRY_AFTER = 60           # Stream dropped: poll for this long before retrying
+UNSUPPORTED_RETRY_AFTER = 3600  # Endpoint missing: retry push hourly
+# ============================================
+
+
+def parse_sse(chunks):
+    """Yield (event, data, id) tuples from an iterable of text chunks"""
+    buffer = ""
+    event, data, event_id = None, [], None
+    for chunk in chunks:
+        buffer += chunk
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            line = line.rstrip("\r")
+            if not line:
+                if data:
+                    yield event or "message", "\n".join(data), event_id
+                event, data = None, []
+                continue
+            if line.startswith(":"):
+                continue  # Comment / heartbeat
+            field, _, value = line.partition(":")
+            if value.startswith(" "):
+                value = value[1:]
+            if field == "event":
+                event = value
+            elif field == "data":
+                data.append(value)
+            elif field == "id":
+                event_id = value
+
+
+def _decode(byte_chunks):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in byte_chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+
+class PushClient:
+    """SSE / long-poll client with automatic fallback to polling"""
+
+    def __init__(self, url, on_orders):
+        self.url = url
+        self.on_orders = on_orders  # Called as on_orders([Order, ...], last_id)
+        self.mode = None            # "sse", "long-poll" or None
+        self.retry_at = 0.0
+        self.last_error = None
+
+    def available(self):
+        """True when the stream should be (re)tried instead of polling"""
+        return time.monotonic() >= self.retry_at
+
+    def run(self, get_last_id):
+        """Deliver orders until the stream becomes unavailable"""
+        while self.available():
+            self.listen(get_last_id())
+
+    def listen(self, last_id):
+        """Open one stream / long-poll request and deliver what arrives"""
+        started = time.monotonic()
+        try:
+            response = get_session().get(
+                self.url,
+                params={"last_id": last_id, "wait": LONG_POLL_WAIT},
+                headers={"Accept": "text/event-stream, application/json;q=0.5"},
+                stream=True,
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+            )
+        except requests.exceptions.RequestException as e:
+            self._fallback(e, RETRY_AFTER)
+            return
+
+        with response:
+            if response.status_code in (404, 405, 501):
+                self._fallback(f"HTTP {response.status_code}", UNSUPPORTED_RETRY_AFTER)
+                return
+            if response.status_code != 200:
+                self._fallback(f"HTTP {response.status_code}", RETRY_AFTER)
+                return
+
+            try:
+                if response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                    self.mode = "sse"
+                    chunks = _decode(response.iter_content(chunk_size=None))
+                    for event, data, _ in parse_sse(chunks):
+                        if event == "orders":
+                            self._deliver(json.loads(data))
+                    if time.monotonic() - started < MIN_LONG_POLL:
+                        # Stream closed as soon as it opened: don't spin on reconnects
+                        self._fallback("stream closed immediately", RETRY_AFTER)
+                else:
+                    self.mode = "long-poll"
+                    data = response.json()
+                    if not isinstance(data, dict):
+                        raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+                    if not data.get("orders") and time.monotonic() - started < MIN_LONG_POLL:
+                        # Server answered straight away: it is a plain poll endpoint
+                        self._fallback("server does not hold requests", UNSUPPORTED_RETRY_AFTER)
+                        return
+                    self._deliver(data)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self._fallback(e, RETRY_AFTER)
+
+    def _deliver(self, data):
+        """Hand over a batch; last_id moves on even if no record could be decoded"""
+        if not isinstance(data, dict):
+            raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+        orders = decode_orders(data.get("orders"))
+        last_id = data.get("last_id")
+        if last_id is None:
+            last_id = max((order.id for order in orders), default=None)
+        if orders or last_id is not None:
+            self.on_orders(orders, int(last_id))
+
+    def _fallback(self, error, retry_after):
+        if self.mode or self.last_error is None:
+            print(f"Push unavailable ({error}) - polling for {retry_after}s")
+        self.mode = None
+        self.last_error = error
+        self.retry_at = time.monotonic() + retry_after
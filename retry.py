@@ -0,0 +1,198 @@
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+
+import metrics
+
+# Retry policy for the order poll.
+#
+# A poll that hits a reset connection, a timeout or a 5xx is retried within
+# the same cycle instead of waiting a whole interval:
+#   - separate connect / read timeouts, so a dead host fails in seconds
+#   - decorrelated jitter between attempts (sleep = rand(BASE, 3 * last)),
+#     so terminals recovering from the same outage don't retry in lockstep
+#   - a retry budget: retries (and hedges) may add at most BUDGET_RATIO
+#     extra requests per request sent over the last BUDGET_WINDOW seconds,
+#     so a struggling API is never hit with a retry storm
+#   - optional hedging: when an attempt is still waiting after the p95 of
+#     recent round-trips, a second identical request is sent and whichever
+#     answers first wins
+# Retries, hedges and exhausted budgets are counted in metrics.py.
+
+# =============== CONFIGURATION ===============
+CONNECT_TIMEOUT = 3.05    # Seconds to establish the TCP / TLS connection
+READ_TIMEOUT = 10         # Seconds to wait for the server between bytes
+ATTEMPTS = 3              # Tries per poll, including the first
+BASE_DELAY = 0.25         # Smallest pause between attempts
+MAX_DELAY = 4.0           # Largest pause between attempts
+DEADLINE = 20             # A poll never takes longer than this overall
+BUDGET_RATIO = 0.2        # Extra requests allowed per request sent ...
+BUDGET_MIN = 3            # ... but always at least this many ...
+BUDGET_WINDOW = 60        # ... per this many seconds
+HEDGE = True              # Send a second request when the first is slow
+HEDGE_QUANTILE = 0.95     # ... slower than this quantile of recent polls
+HEDGE_MIN_DELAY = 0.25    # Never hedge sooner than this
+HEDGE_MIN_SAMPLES = 20    # Round-trips needed before hedging starts
+# ============================================
+
+RETRY_STATUS = (500, 502, 503, 504)
+RETRYABLE = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+RETRIES = metrics.counter("notifier_retries_total", "Poll attempts after the first")
+HEDGES = metrics.counter("notifier_hedges_total", "Hedged second requests sent")
+HEDGE_WINS = metrics.counter("notifier_hedge_wins_total", "Polls answered by the hedged request")
+BUDGET_EXHAUSTED = metrics.counter("notifier_retry_budget_exhausted_total",
+                                   "Retries or hedges skipped because the budget was spent")
+
+
+def _close_quietly(response):
+    if response is None:
+        return
+    try:
+        response.close()
+    except Exception:
+        pass
+
+
+class RetryPolicy:
+    """Budgeted, jittered retries with optional hedging"""
+
+    def __init__(self, attempts=ATTEMPTS, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, base_delay=BASE_DELAY, max_delay=MAX_DELAY,
+                 deadline=DEADLINE, budget_ratio=BUDGET_RATIO, budget_min=BUDGET_MIN,
+                 hedge=HEDGE):
+        self.attempts = attempts
+        self.timeout = (connect_timeout, read_timeout)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.budget_ratio = budget_ratio
+        self.budget_min = budget_min
+        self.hedge = hedge
+        self.stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "budget_exhausted": 0}
+        self._requests = deque()      # Monotonic times of first attempts
+        self._extras = deque()        # Monotonic times of retries / hedges
+        self._latencies = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def call(self, request, timeout=None, deadline=None):
+        """Run request(timeout) -> response under the policy and return the response.
+
+        deadline (seconds) overrides DEADLINE for this call. The final
+        response is returned even if it is a 5xx; the last exception is
+        raised if no attempt got an answer.
+        """
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + (deadline or self.deadline)
+        delay = self.base_delay
+        with self._lock:
+            self.stats["calls"] += 1
+            self._requests.append(time.monotonic())
+
+        for attempt in range(1, self.attempts + 1):
+            response, error = None, None
+            try:
+                response = self._attempt(request, timeout)
+            except RETRYABLE as e:
+                error = e
+            if response is not None and response.status_code not in RETRY_STATUS:
+                return response
+
+            delay = min(self.max_delay, random.uniform(self.base_delay, delay * 3))
+            last = (attempt == self.attempts or time.monotonic() + delay >= deadline
+                    or not self._spend_budget())
+            if last:
+                if response is not None:
+                    return response
+                raise error
+            if response is not None:
+                _close_quietly(response)
+            with self._lock:
+                self.stats["retries"] += 1
+            RETRIES.inc()
+            time.sleep(delay)
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None if hedging is off / not calibrated"""
+        if not self.hedge or len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return max(HEDGE_MIN_DELAY, ordered[min(int(HEDGE_QUANTILE * len(ordered)), len(ordered) - 1)])
+
+    def _spend_budget(self):
+        now = time.monotonic()
+        with self._lock:
+            for times in (self._requests, self._extras):
+                while times and now - times[0] > BUDGET_WINDOW:
+                    times.popleft()
+            if len(self._extras) >= max(self.budget_min, self.budget_ratio * len(self._requests)):
+                self.stats["budget_exhausted"] += 1
+                BUDGET_EXHAUSTED.inc()
+                return False
+            self._extras.append(now)
+            return True
+
+    def _timed(self, request, timeout):
+        started = time.monotonic()
+        response = request(timeout)
+        self._latencies.append(time.monotonic() - started)
+        return response
+
+    def _attempt(self, request, timeout):
+        hedge_after = self.hedge_delay()
+        if hedge_after is None:
+            return self._timed(request, timeout)
+
+        results = queue.Queue()
+
+        def run(hedged):
+            try:
+                results.put((hedged, self._timed(request, timeout), None))
+            except Exception as e:
+                results.put((hedged, None, e))
+
+        threading.Thread(target=run, args=(False,), daemon=True).start()
+        outstanding = 1
+        try:
+            first = results.get(timeout=hedge_after)
+        except queue.Empty:
+            first = None
+            if self._spend_budget():
+                with self._lock:
+                    self.stats["hedges"] += 1
+                HEDGES.inc()
+                threading.Thread(target=run, args=(True,), daemon=True).start()
+                outstanding = 2
+
+        answers = []
+        while outstanding:
+            item = first if first is not None else results.get()
+            first = None
+            outstanding -= 1
+            hedged, response, error = item
+            if response is not None and response.status_code not in RETRY_STATUS:
+                for _, other, _ in answers:
+                    if other is not None:
+                        _close_quietly(other)
+                if outstanding:
+                    # The slower request is still running: drop its answer when it lands
+                    threading.Thread(target=lambda: _close_quietly(results.get()[1]),
+                                     daemon=True).start()
+                if hedged:
+                    with self._lock:
+                        self.stats["hedge_wins"] += 1
+                    HEDGE_WINS.inc()
+                return response
+            answers.append(item)
+
+        # Neither answered usefully: a 5xx response beats an exception
+        responses = [response for _, response, _ in answers if response is not None]
+        for response in responses[1:]:
+            _close_quietly(response)
+        if responses:
+            return responses[0]
+        raise answers[-1][2]
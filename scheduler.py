@@ -0,0 +1,100 @@
+import random
+import time
+from collections import deque
+from datetime import datetime
+
+# Adaptive poll interval: poll fast right after orders and during the
+# lunch/dinner rush, back off exponentially when nothing is happening.
+
+# =============== CONFIGURATION ===============
+MIN_INTERVAL = 5        # Never poll faster than this (seconds)
+MAX_INTERVAL = 120      # Never wait longer than this (seconds)
+BASE_INTERVAL = 30      # Normal interval outside peak hours
+PEAK_INTERVAL = 10      # Interval during peak windows
+RECENT_ORDER_WINDOW = 300  # Poll at MIN_INTERVAL for this long after an order
+BACKOFF_FACTOR = 1.5    # Idle interval grows by this factor per empty poll
+JITTER = 0.1            # +/- 10% so terminals don't poll in lockstep
+PEAK_WINDOWS = [("11:30", "14:30"), ("16:30", "22:00")]  # Local time, HH:MM
+# ============================================
+
+
+def _parse_windows(windows):
+    parsed = []
+    for start, end in windows:
+        parsed.append((datetime.strptime(start, "%H:%M").time(),
+                       datetime.strptime(end, "%H:%M").time()))
+    return parsed
+
+
+class AdaptiveScheduler:
+    """Decides how long to sleep before the next poll"""
+
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 base_interval=BASE_INTERVAL, peak_interval=PEAK_INTERVAL,
+                 recent_window=RECENT_ORDER_WINDOW, backoff=BACKOFF_FACTOR,
+                 jitter=JITTER, peak_windows=PEAK_WINDOWS, history=50):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.base_interval = base_interval
+        self.peak_interval = peak_interval
+        self.recent_window = recent_window
+        self.backoff = backoff
+        self.jitter = jitter
+        self.peak_windows = _parse_windows(peak_windows)
+        self.idle_polls = 0
+        self.last_order_at = None
+        self.interval = base_interval
+        self.reason = "startup"
+        self.decisions = deque(maxlen=history)
+
+    def record_poll(self, new_orders=0):
+        """Feed the result of a poll (number of new orders) back in"""
+        if new_orders:
+            self.last_order_at = time.monotonic()
+            self.idle_polls = 0
+        elif self.base_interval * self.backoff ** self.idle_polls < self.max_interval:
+            self.idle_polls += 1  # Stop counting once the backoff is at the cap
+
+    def in_peak(self, now=None):
+        now = (now or datetime.now()).time()
+        for start, end in self.peak_windows:
+            if start <= end:
+                if start <= now < end:
+                    return True
+            elif now >= start or now < end:  # Window wraps past midnight
+                return True
+        return False
+
+    def next_interval(self, now=None):
+        """Return the number of seconds to wait before the next poll"""
+        since_order = None
+        if self.last_order_at is not None:
+            since_order = time.monotonic() - self.last_order_at
+
+        if since_order is not None and since_order < self.recent_window:
+            interval, reason = self.min_interval, "recent order"
+        elif self.in_peak(now):
+            interval, reason = self.peak_interval, "peak window"
+        else:
+            interval = self.base_interval * self.backoff ** self.idle_polls
+            reason = f"idle x{self.idle_polls}"
+
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        if self.jitter:
+            interval *= 1 + random.uniform(-self.jitter, self.jitter)
+            interval = min(max(interval, self.min_interval), self.max_interval)
+
+        self.interval = interval
+        self.reason = reason
+        self.decisions.append((time.time(), round(interval, 2), reason))
+        return interval
+
+    def snapshot(self):
+        """Current state, for logging or inspection"""
+        return {
+            "interval": round(self.interval, 2),
+            "reason": self.reason,
+            "idle_polls": self.idle_polls,
+            "in_peak": self.in_peak(),
+            "recent_decisions": list(self.decisions),
+        }
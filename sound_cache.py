@@ -0,0 +1,185 @@
+import hashlib
+import os
+import platform
+import subprocess
+import threading
+import time
+import wave
+
+import probe
+
+# Decode the alert sound once and play it from memory.
+#
+# play.mp3 is converted to 16-bit PCM WAV with ffmpeg the first time it is
+# seen and cached on disk under a name derived from a hash of its contents,
+# so later starts (and edits to the sound) never re-run the conversion
+# needlessly. Playback then comes from an in-memory buffer:
+#   - Windows: winsound.PlaySound(..., SND_MEMORY)
+#   - simpleaudio, if installed
+#   - otherwise a long-lived pacat / aplay process fed raw PCM on stdin
+# This is the "memory" sound driver; drivers.py falls back to external
+# players when no in-memory backend works.
+
+# =============== CONFIGURATION ===============
+CACHE_DIR = probe.CACHE_DIR    # Shared with the capability probe
+SAMPLE_RATE = 44100
+# ============================================
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+def cached_wav(source, cache_dir=CACHE_DIR):
+    """Return a PCM WAV for source, decoding with ffmpeg only on a cache miss"""
+    if source.lower().endswith(".wav"):
+        return source
+    name = os.path.splitext(os.path.basename(source))[0]
+    target = os.path.join(cache_dir, f"{name}-{file_hash(source)}.wav")
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = target + ".tmp"
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", source,
+         "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-f", "wav", tmp],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=True,
+        timeout=60,
+    )
+    os.replace(tmp, target)
+    return target
+
+
+class Sound:
+    """A WAV file held in memory"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.wav_bytes = f.read()
+        with wave.open(path, "rb") as w:
+            self.channels = w.getnchannels()
+            self.sample_width = w.getsampwidth()
+            self.rate = w.getframerate()
+            self.pcm = w.readframes(w.getnframes())
+
+    @property
+    def duration(self):
+        return len(self.pcm) / float(self.rate * self.channels * self.sample_width)
+
+
+class PcmSink:
+    """Long-lived pacat / aplay process that plays raw PCM written to stdin"""
+
+    def __init__(self, sound):
+        self.sound = sound
+        self.process = None
+        self.command = self._command()
+
+    def _command(self):
+        s = self.sound
+        if s.sample_width != 2:
+            return None
+        if probe.has("pacat"):
+            return ["pacat", "--playback", "--raw", "--format=s16le",
+                    f"--rate={s.rate}", f"--channels={s.channels}"]
+        if probe.has("aplay"):
+            return ["aplay", "-q", "-t", "raw", "-f", "S16_LE",
+                    "-r", str(s.rate), "-c", str(s.channels)]
+        return None
+
+    def available(self):
+        return self.command is not None
+
+    def play(self, pcm):
+        for _ in range(2):  # Restart the sink once if it died
+            if self.process is None or self.process.poll() is not None:
+                self.process = subprocess.Popen(
+                    self.command, stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            try:
+                self.process.stdin.write(pcm)
+                self.process.stdin.flush()
+                return
+            except (BrokenPipeError, OSError):
+                self.process = None
+        raise RuntimeError("audio sink process keeps exiting")
+
+    def close(self):
+        if self.process and self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.terminate()
+
+
+class SoundPlayer:
+    """Plays one alert sound with the cheapest backend available"""
+
+    def __init__(self, source):
+        self.source = source
+        self.sound = None
+        self.backend = None
+        self._sink = None
+        self._lock = threading.Lock()
+
+    def prepare(self):
+        """Decode / load the sound and pick a backend (None if there is none)"""
+        with self._lock:
+            if self.backend is not None:
+                return self.backend or None
+            self.backend = ""  # Only try once
+            try:
+                self.sound = Sound(cached_wav(self.source))
+            except (OSError, subprocess.SubprocessError, wave.Error, EOFError) as e:
+                print(f"Couldn't decode {self.source} ({e}); using external player")
+                return None
+
+            if platform.system() == "Windows":
+                self.backend = "winsound"
+            elif self._has_simpleaudio():
+                self.backend = "simpleaudio"
+            else:
+                self._sink = PcmSink(self.sound)
+                if self._sink.available():
+                    self.backend = "sink"
+            return self.backend or None
+
+    def play(self, times=1, gap=0.3):
+        """Play the sound `times` times, blocking until done"""
+        if not self.prepare():
+            raise RuntimeError(f"no in-memory playback for {self.source}")
+        for i in range(times):
+            if i:
+                time.sleep(gap)
+            self._play_once()
+
+    def close(self):
+        if self._sink:
+            self._sink.close()
+
+    def _play_once(self):
+        if self.backend == "winsound":
+            import winsound
+            winsound.PlaySound(self.sound.wav_bytes, winsound.SND_MEMORY)
+        elif self.backend == "simpleaudio":
+            import simpleaudio
+            s = self.sound
+            simpleaudio.play_buffer(s.pcm, s.channels, s.sample_width, s.rate).wait_done()
+        else:
+            self._sink.play(self.sound.pcm)
+            time.sleep(self.sound.duration)
+
+    @staticmethod
+    def _has_simpleaudio():
+        if not probe.has("simpleaudio"):
+            return False
+        try:
+            import simpleaudio
+            return True
+        except ImportError:
+            return False
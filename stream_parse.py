@@ -0,0 +1,164 @@
+import codecs
+import json
+
+# Incremental parser for the new-orders payload
+#   {"orders": [{...}, {...}, ...], "last_id": 123, "count": 2}
+#
+# Orders are yielded one at a time as soon as each one has been received,
+# so a catch-up response with thousands of orders never has to be held in
+# memory (or wait for the last byte) before the first alert goes out. The
+# other top-level fields are collected into `fields`.
+
+WHITESPACE = " \t\r\n"
+SCALAR_END = ",}]" + WHITESPACE
+
+
+class IncompleteError(Exception):
+    """More input is needed to finish the current value"""
+
+
+def _value_end(text, i):
+    """Index just past the JSON value starting at text[i]"""
+    first = text[i]
+    if first == '"':
+        return _string_end(text, i)
+    if first not in "{[":
+        j = i
+        while j < len(text) and text[j] not in SCALAR_END:
+            j += 1
+        if j == len(text):
+            raise IncompleteError
+        return j
+
+    depth = 0
+    j = i
+    while j < len(text):
+        c = text[j]
+        if c == '"':
+            j = _string_end(text, j)
+            continue
+        if c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return j + 1
+        j += 1
+    raise IncompleteError
+
+
+def _string_end(text, i):
+    j = i + 1
+    while j < len(text):
+        c = text[j]
+        if c == "\\":
+            j += 2
+            continue
+        if c == '"':
+            return j + 1
+        j += 1
+    raise IncompleteError
+
+
+class OrderStreamParser:
+    """Feed text chunks in, get parsed orders out"""
+
+    # States
+    START, KEY, COLON, VALUE, AFTER_VALUE, ORDER, AFTER_ORDER, DONE = range(8)
+
+    def __init__(self):
+        self.fields = {}
+        self.orders_seen = 0
+        self._buf = ""
+        self._pos = 0
+        self._state = self.START
+        self._key = None
+
+    def feed(self, text):
+        """Add text; return the list of orders completed by it"""
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        orders = []
+        try:
+            self._parse(orders)
+        except IncompleteError:
+            pass
+        return orders
+
+    def close(self):
+        if self._state != self.DONE:
+            raise ValueError("truncated orders response")
+
+    def _skip_ws(self):
+        buf, i = self._buf, self._pos
+        while i < len(buf) and buf[i] in WHITESPACE:
+            i += 1
+        self._pos = i
+        if i == len(buf):
+            raise IncompleteError
+        return buf[i]
+
+    def _expect(self, chars):
+        c = self._skip_ws()
+        if c not in chars:
+            raise ValueError(f"unexpected {c!r} in orders response")
+        self._pos += 1
+        return c
+
+    def _parse(self, orders):
+        while self._state != self.DONE:
+            if self._state == self.START:
+                self._expect("{")
+                self._state = self.KEY
+            elif self._state == self.KEY:
+                if self._skip_ws() == "}":
+                    self._pos += 1
+                    self._state = self.DONE
+                    continue
+                end = _value_end(self._buf, self._pos)
+                self._key = json.loads(self._buf[self._pos:end])
+                self._pos = end
+                self._state = self.COLON
+            elif self._state == self.COLON:
+                self._expect(":")
+                self._state = self.VALUE
+            elif self._state == self.VALUE:
+                if self._key == "orders" and self._skip_ws() == "[":
+                    self._pos += 1
+                    self._state = self.ORDER
+                    continue
+                self._skip_ws()
+                end = _value_end(self._buf, self._pos)
+                self.fields[self._key] = json.loads(self._buf[self._pos:end])
+                self._pos = end
+                self._state = self.AFTER_VALUE
+            elif self._state == self.AFTER_VALUE:
+                if self._expect(",}") == "}":
+                    self._state = self.DONE
+                else:
+                    self._state = self.KEY
+            elif self._state == self.ORDER:
+                if self._skip_ws() == "]":
+                    self._pos += 1
+                    self._state = self.AFTER_VALUE
+                    continue
+                end = _value_end(self._buf, self._pos)
+                orders.append(json.loads(self._buf[self._pos:end]))
+                self.orders_seen += 1
+                self._pos = end
+                self._state = self.AFTER_ORDER
+            elif self._state == self.AFTER_ORDER:
+                if self._expect(",]") == "]":
+                    self._state = self.AFTER_VALUE
+                else:
+                    self._state = self.ORDER
+
+
+def iter_orders(byte_chunks, parser=None):
+    """Yield orders from an iterable of UTF-8 byte chunks"""
+    parser = parser or OrderStreamParser()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for chunk in byte_chunks:
+        yield from parser.feed(decoder.decode(chunk))
+    yield from parser.feed(decoder.decode(b"", final=True))
+    parser.close()
@@ -0,0 +1,201 @@
+import ipaddress
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+import urllib3.util.connection
+
+import metrics
+import probe
+from http_session import get_session
+
+# Warm connections to the order API.
+#
+# Keep-alive alone doesn't survive the idle gap between polls on the shops'
+# 4G / ADSL links: NAT boxes forget the mapping and the server closes idle
+# sockets, so the first request after a quiet spell pays DNS, TCP and TLS
+# again on the critical path. This module moves that work off it:
+#   - DnsCache keeps the API host's addresses for their TTL (read with
+#     dnspython when installed, DNS_TTL otherwise) and keeps answering with
+#     the last addresses for up to STALE_FOR when the resolver fails
+#   - connections to the host get TCP keepalives, so NAT mappings stay up
+#   - ConnectionKeeper.warm(), run by cycle.py just before each poll, checks
+#     the pooled connection the poll is about to use and opens a fresh one
+#     (TCP + TLS) if there is none or the server / a middlebox dropped it
+# Every connection opened while a request was waiting is a cold connect;
+# the reuse ratio (polls that found a warm socket) is exported in metrics.
+
+# =============== CONFIGURATION ===============
+DNS_TTL = 300          # Cache lifetime when the record's TTL is unknown
+MIN_TTL = 30           # Never re-resolve more often than this ...
+MAX_TTL = 3600         # ... or trust an answer for longer than this
+STALE_FOR = 24 * 3600  # Keep using expired addresses this long if DNS fails
+WARM_TIMEOUT = 1.5     # Seconds a warm-up may spend connecting
+KEEPALIVE_IDLE = 15    # Seconds idle before the first TCP keepalive probe
+KEEPALIVE_INTERVAL = 10
+# ============================================
+
+COLD_CONNECTS = metrics.counter("notifier_cold_connects_total",
+                                "API connections opened while a request waited")
+WARM_CONNECTS = metrics.counter("notifier_warm_connects_total",
+                                "API connections opened ahead of a poll by the warm-up")
+DNS_STALE = metrics.counter("notifier_dns_stale_total",
+                            "Lookups answered from expired cache entries because DNS failed")
+
+_create_connection = urllib3.util.connection.create_connection
+_caches = {}            # Host -> DnsCache, for hosts with a keeper
+_local = threading.local()
+
+
+def _keepalive_options():
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE))
+    if hasattr(socket, "TCP_KEEPINTVL"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, KEEPALIVE_INTERVAL))
+    return options
+
+
+def _lookup(host, port):
+    """Resolve host -> ([(family, sockaddr)], ttl)"""
+    if probe.has("dns"):
+        import dns.exception
+        import dns.resolver
+        try:
+            answer = dns.resolver.resolve(host, "A")
+            addresses = [(socket.AF_INET, (record.address, port)) for record in answer]
+            return addresses, answer.rrset.ttl
+        except dns.exception.DNSException:
+            pass  # /etc/hosts names, AAAA-only hosts ...: ask the system resolver
+    infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    return [(family, sockaddr) for family, _, _, _, sockaddr in infos], DNS_TTL
+
+
+class DnsCache:
+    """Addresses of one host, honouring TTLs, with a stale-on-error fallback"""
+
+    def __init__(self, stale_for=STALE_FOR):
+        self.stale_for = stale_for
+        self.entries = {}   # port -> (addresses, expires_at)
+        self.stats = {"hits": 0, "lookups": 0, "stale": 0, "failures": 0}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port):
+        now = time.monotonic()
+        with self._lock:
+            entry = self.entries.get(port)
+            if entry and now < entry[1]:
+                self.stats["hits"] += 1
+                return entry[0]
+        try:
+            addresses, ttl = _lookup(host, port)
+        except OSError:
+            with self._lock:
+                self.stats["failures"] += 1
+                if entry and now < entry[1] + self.stale_for:
+                    self.stats["stale"] += 1
+                    DNS_STALE.inc()
+                    return entry[0]
+            raise
+        with self._lock:
+            self.stats["lookups"] += 1
+            self.entries[port] = (addresses, now + min(max(ttl, MIN_TTL), MAX_TTL))
+        return addresses
+
+
+def _connect(address, *args, socket_options=None, **kwargs):
+    """urllib3's create_connection, going through the DNS cache for kept hosts"""
+    host, port = address
+    cache = _caches.get(host)
+    if cache is None:
+        return _create_connection(address, *args, socket_options=socket_options, **kwargs)
+
+    if getattr(_local, "warming", False):
+        WARM_CONNECTS.inc()
+    else:
+        COLD_CONNECTS.inc()
+    options = list(socket_options or []) + _keepalive_options()
+    error = None
+    for _, sockaddr in cache.resolve(host, port):
+        try:
+            return _create_connection(sockaddr[:2], *args, socket_options=options, **kwargs)
+        except OSError as e:
+            error = e  # Try the next address
+    raise error or OSError(f"no addresses for {host}")
+
+
+urllib3.util.connection.create_connection = _connect
+
+
+class ConnectionKeeper:
+    """Keeps the pooled connection to one API URL resolved, open and validated"""
+
+    def __init__(self, url, timeout=WARM_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.dns = None
+        try:
+            ipaddress.ip_address(self.host)
+        except ValueError:
+            self.dns = _caches.setdefault(self.host, DnsCache())
+        self.stats = {"warmups": 0, "alive": 0, "opened": 0, "busy": 0, "failed": 0}
+        metrics.gauge("notifier_warm_reuse_ratio",
+                      "Share of polls sent on an already open connection", self.reuse_ratio)
+
+    def reuse_ratio(self):
+        polls = metrics.POLLS.value
+        if not polls:
+            return 1.0
+        return round(max(0.0, 1 - COLD_CONNECTS.value / polls), 3)
+
+    def _pool(self):
+        session = get_session()
+        adapter = session.get_adapter(self.url)
+        if hasattr(adapter, "get_connection_with_tls_context"):  # requests >= 2.32.2
+            # verify as requests sends it (CA bundle from the environment), so the
+            # pool key - and the pool - is the one the poll will use
+            verify = session.merge_environment_settings(self.url, {}, None, None, None)["verify"]
+            request = requests.Request("GET", self.url).prepare()
+            return adapter.get_connection_with_tls_context(request, verify)
+        return adapter.get_connection(self.url)
+
+    def warm(self):
+        """Resolve the host and make sure the next request finds an open socket"""
+        self.stats["warmups"] += 1
+        if self.dns:
+            try:
+                self.dns.resolve(self.host, self.port)  # Refresh an expired entry now
+            except OSError:
+                pass  # No stale entry either: the poll will report it
+        pool = self._pool()
+        try:
+            # The connection the next request will get; _get_conn already closes
+            # it if the server or a middlebox dropped it
+            conn = pool._get_conn(timeout=0.01)
+        except urllib3.exceptions.EmptyPoolError:
+            self.stats["busy"] += 1  # Every connection is in use: nothing idle to check
+            return
+        _local.warming = True
+        try:
+            if conn.sock is None:
+                conn.timeout = self.timeout
+                conn.connect()
+                self.stats["opened"] += 1
+            else:
+                self.stats["alive"] += 1
+        except (OSError, urllib3.exceptions.HTTPError):
+            self.stats["failed"] += 1  # The poll will connect (and report) itself
+            conn.close()
+        finally:
+            _local.warming = False
+            pool._put_conn(conn)
+
+    def snapshot(self):
+        """Current state, for logging or inspection"""
+        return {"reuse_ratio": self.reuse_ratio(), **self.stats,
+                "dns": dict(self.dns.stats) if self.dns else None}